@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+#benchmarks for the convex hull engines; run directly, results go to stdout
+
+import time
+import numpy
+from convex_hull_core import sortedDistinct, solver, monotoneChain, aklToussaint, computeHull, batchHulls
+
+def randomPoints(n, seed=0): #n points uniform over the square [-1, 1]^2, as an Nx2 array
+
+    rng = numpy.random.RandomState(seed)
+
+    return rng.uniform(-1.0, 1.0, size=(n, 2))
+
+def gaussianPoints(n, seed=0): #n points from a standard normal in each coordinate, as an Nx2 array
+
+    rng = numpy.random.RandomState(seed)
+
+    return rng.normal(size=(n, 2))
+
+def divideVertices(points): #hull vertex rows from the divide and conquer solver, sort included
+
+    order = sortedDistinct(points)
+
+    return order[list(solver(points[order]))]
+
+def benchEngines(sizes=(10000, 100000, 1000000)): #times one full hull per engine, sort included
+
+    print('{:>9} {:>13} {:>12} {:>9}'.format('n', 'divide (s)', 'chain (s)', 'speedup'))
+
+    for n in sizes:
+        points = randomPoints(n)
+
+        start = time.perf_counter()
+        divideHull = divideVertices(points)
+        divideTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        chainHull = monotoneChain(points)
+        chainTime = time.perf_counter() - start
+
+        assert set(divideHull) == set(chainHull) #both engines must find the same hull
+
+        print('{:>9} {:>13.3f} {:>12.3f} {:>8.1f}x'.format(n, divideTime, chainTime, divideTime / chainTime))
+
+def benchPrefilter(sizes=(100000, 1000000), engines=('divide', 'chain'), shapes=('quad', 'octagon')): #discarded fraction and time saved by aklToussaint
+    #times are for the whole computeHull call, so the filter's own pass is charged against what it saves
+
+    print('{:>9} {:>9} {:>7} {:>8} {:>10} {:>10} {:>12} {:>9}'.format('n', 'points', 'engine', 'shape', 'dropped', 'plain (s)', 'filtered (s)', 'saved'))
+
+    for n in sizes:
+        for name, generate in (('uniform', randomPoints), ('gaussian', gaussianPoints)):
+            points = generate(n)
+
+            for engine in engines:
+                start = time.perf_counter()
+                plainHull = computeHull(points, engine)
+                plainTime = time.perf_counter() - start
+
+                for shape in shapes:
+                    dropped = 1 - len(aklToussaint(points, shape)) / n
+
+                    start = time.perf_counter()
+                    filteredHull = computeHull(points, engine, prefilter=shape)
+                    filteredTime = time.perf_counter() - start
+
+                    assert numpy.array_equal(plainHull, filteredHull) #the prefilter must never change the hull
+
+                    print('{:>9} {:>9} {:>7} {:>8} {:>9.2%} {:>10.3f} {:>12.3f} {:>8.1%}'.format(n, name, engine, shape, dropped, plainTime, filteredTime,
+                        1 - filteredTime / plainTime))
+
+def benchBatch(groupCounts=(1000, 10000, 30000), meanSize=30, processes=(1, 2)): #batchHulls against one computeHull call per group
+
+    for points, offsets, expected in ((numpy.zeros((0, 2)), [0], [0]), (numpy.zeros((0, 2)), [0, 0], [0, 0]), (numpy.zeros((3, 2)), [0, 3], [0, 1])):
+        indices, hullOffsets = batchHulls(points, offsets) #empty batches, and a group that is one point repeated
+        assert numpy.array_equal(hullOffsets, expected) and len(indices) == expected[-1]
+
+    print('{:>7} {:>9} {:>10} {:>11} {:>9}'.format('groups', 'processes', 'loop (s)', 'batch (s)', 'speedup'))
+
+    rng = numpy.random.RandomState(0)
+
+    for groupCount in groupCounts:
+        offsets = numpy.concatenate(([0], numpy.cumsum(rng.randint(1, 2 * meanSize, size=groupCount))))
+        points = gaussianPoints(offsets[-1])
+
+        start = time.perf_counter()
+        loopHulls = [offsets[i] + computeHull(points[offsets[i]:offsets[i + 1]]) for i in range(groupCount)]
+        loopTime = time.perf_counter() - start
+
+        for count in processes:
+            start = time.perf_counter()
+            indices, hullOffsets = batchHulls(points, offsets, count)
+            batchTime = time.perf_counter() - start
+
+            assert numpy.array_equal(numpy.concatenate(loopHulls), indices) and numpy.array_equal(numpy.cumsum([len(hull) for hull in loopHulls]), hullOffsets[1:])
+
+            print('{:>7} {:>9} {:>10.3f} {:>11.3f} {:>8.1f}x'.format(groupCount, count, loopTime, batchTime, loopTime / batchTime))
+
+if __name__ == '__main__':
+    benchEngines()
+    benchPrefilter()
+    benchBatch()
@@ -0,0 +1,570 @@
+#!/usr/bin/python3
+#headless convex hull engines: NumPy coordinate arrays in, NumPy index arrays out, and no Qt anywhere
+#convex_hull.ConvexHullSolver wraps computeHull for the GUI's QPointF lists
+
+import numpy
+import os
+import bisect
+import multiprocessing
+from multiprocessing import shared_memory
+
+CHAIN_PASS_MIN_DROP = 0.05 #monotoneChain's vectorized passes stop once a pass drops less than this fraction of the chain
+HULL_ENGINES = ('chain', 'divide') #engines computeHull can run
+PREFILTER_DIRECTIONS = {'quad': ((1, 0), (0, 1)), 'octagon': ((1, 0), (0, 1), (1, 1), (1, -1))} #aklToussaint's shapes: the axes whose two extremes become corners
+INCREMENTAL_REBUILD_FRACTION = 1.0 #IncrementalHull.extend rebuilds with monotoneChain once the surviving batch outnumbers the hull by this factor
+STREAM_CHUNK_ROWS = 1 << 20 #points streamHull reads per chunk; its working memory is about 16 bytes times this, plus the hull
+BATCH_MIN_POINTS = 200000 #batchHulls solves smaller batches in-process; the pool and shared copy cost more than they save
+PARALLEL_MIN_POINTS = 200000 #parallelHull solves smaller inputs in-process; the pool and shared copy cost more than they save
+
+def asPoints(points): #Nx2 float64 view of any array-like or buffer-protocol object (an Nx2 array, or a flat x0, y0, x1, y1, ... buffer)
+#no copy is made when the input already holds float64 values, e.g. an ndarray, array.array('d') or a memoryview of either
+
+    points = numpy.asarray(points, dtype=float)
+
+    if points.ndim == 1:
+        if len(points) % 2:
+            raise ValueError('Flat coordinate buffer needs an even length, got {}'.format(len(points)))
+        points = points.reshape(-1, 2)
+
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError('Points must be an Nx2 array, got shape {}'.format(points.shape))
+
+    return points
+
+class Hull: #compact hull structure for one solve: a shared coordinate buffer plus clockwise/counterclockwise links stored as index arrays
+#rows must be sorted by x then y with no repeats (see sortedDistinct), so a run of rows [start, end) always has start as its leftmost hull vertex
+#and end - 1 as its rightmost; the sub-hulls of a divide and conquer are therefore just row ranges, and merging two of them only rewrites four links
+    __slots__ = ('xs', 'ys', 'nextCW', 'nextCCW', 'leftmost', 'rightmost')
+
+    def __init__(self, points): #every row starts out as its own one-vertex hull, linked to itself
+        n = len(points)
+        self.xs = memoryview(numpy.ascontiguousarray(points[:, 0], dtype=float)) #memoryviews give plain-float element access without copying the buffer
+        self.ys = memoryview(numpy.ascontiguousarray(points[:, 1], dtype=float))
+        self.nextCW = memoryview(numpy.arange(n, dtype=numpy.int64))
+        self.nextCCW = memoryview(numpy.arange(n, dtype=numpy.int64))
+        self.leftmost = 0
+        self.rightmost = n - 1
+
+    def __iter__(self): #O(h) walk of the vertex rows, clockwise from the leftmost
+        curr = self.leftmost
+        while True:
+            yield curr
+            curr = self.nextCW[curr]
+            if curr == self.leftmost:
+                break
+
+    def getLength(self): #O(h)
+        return sum(1 for vertex in self)
+
+    def edges(self): #O(h) polygon edges as (start, end) row pairs, clockwise
+        for vertex in self:
+            yield vertex, self.nextCW[vertex]
+
+    def link(self, rows): #makes rows one clockwise cycle, in the order given; rows must already be a convex polygon
+        nextCW = self.nextCW
+        nextCCW = self.nextCCW
+        rows = list(rows)
+        for prev, curr in zip(rows, rows[1:] + rows[:1]):
+            nextCW[prev] = curr
+            nextCCW[curr] = prev
+
+    def turn(self, o, a, b): #z of (a - o) x (b - o) for rows o, a, b; > 0 is a counterclockwise turn
+        xs = self.xs
+        ys = self.ys
+        return (xs[a] - xs[o]) * (ys[b] - ys[o]) - (ys[a] - ys[o]) * (xs[b] - xs[o])
+
+    def join(self, leftEnd, rightStart): #merges the hull whose rightmost row is leftEnd with the hull starting at row rightStart = leftEnd + 1
+    #walks to the upper and lower tangents and splices them in; the walks are O(size of the two hulls) and nothing is allocated
+    #a candidate collinear with the tangent is taken only if it lies further out, so collinear points drop out and the walks always end
+        nextCW = self.nextCW
+        nextCCW = self.nextCCW
+        turn = self.turn
+
+        left, right = leftEnd, rightStart #upper tangent: the right end goes clockwise (up), the left end counterclockwise (up)
+        moved = True
+        while moved:
+            moved = False
+            candidate = nextCW[right]
+            while turn(left, right, candidate) > 0 or (candidate > right and turn(left, right, candidate) == 0):
+                right, candidate = candidate, nextCW[candidate]
+            candidate = nextCCW[left]
+            while turn(left, right, candidate) > 0 or (candidate < left and turn(left, right, candidate) == 0):
+                left, candidate = candidate, nextCCW[candidate]
+                moved = True
+        upperLeft, upperRight = left, right
+
+        left, right = leftEnd, rightStart #lower tangent: same walk with the directions flipped
+        moved = True
+        while moved:
+            moved = False
+            candidate = nextCCW[right]
+            while turn(left, right, candidate) < 0 or (candidate > right and turn(left, right, candidate) == 0):
+                right, candidate = candidate, nextCCW[candidate]
+            candidate = nextCW[left]
+            while turn(left, right, candidate) < 0 or (candidate < left and turn(left, right, candidate) == 0):
+                left, candidate = candidate, nextCW[candidate]
+                moved = True
+        lowerLeft, lowerRight = left, right
+
+        nextCW[upperLeft] = upperRight #everything between the tangent points is cut out of the cycle
+        nextCCW[upperRight] = upperLeft
+        nextCW[lowerRight] = lowerLeft
+        nextCCW[lowerLeft] = lowerRight
+
+def sortedDistinct(points): #O(nlogn); row order of an Nx2 array by x, ties broken by y (one lexsort), keeping only the first of any repeated point
+#copies of a point would each see the other as a zero-length edge, which both engines would treat as collinear and drop together
+
+    order = numpy.lexsort((points[:, 1], points[:, 0]))
+    sortedPoints = points[order]
+    distinct = numpy.ones(len(order), dtype=bool)
+    distinct[1:] = numpy.any(sortedPoints[1:] != sortedPoints[:-1], axis=1)
+
+    return order[distinct]
+
+def crossArray(o, a, b): #z component of (a - o) x (b - o) for rows of Nx2 arrays; > 0 is a counterclockwise turn
+
+    return (a[:, 0] - o[:, 0]) * (b[:, 1] - o[:, 1]) - (a[:, 1] - o[:, 1]) * (b[:, 0] - o[:, 0])
+
+def halfChain(points, chain, groups=None): #reduces chain (row indices in sorted order) to the hull vertices that turn counterclockwise along it
+#a middle point that doesn't turn left against its current neighbors lies on or under a segment between two input points, so it can never be a hull vertex;
+#whole vectorized passes drop every such point at once, and once a pass stops paying off a stack (Andrew's loop) finishes what is left in O(len(chain))
+#groups, if given, is a group id per chain entry with equal ids contiguous; each group is then reduced as its own chain, all in the same passes,
+#and the stack only runs over the groups the last pass still changed, as the others are already convex
+
+    unsettled = None #groups the last pass dropped entries from; None until a pass has run
+
+    while len(chain) > 2: #each pass is O(len(chain)) numpy work
+
+        coords = points[chain]
+        keep = numpy.ones(len(chain), dtype=bool)
+        keep[1:-1] = crossArray(coords[:-2], coords[1:-1], coords[2:]) > 0
+        if groups is not None: #the first and last entries of a group always stay
+            keep[1:-1] |= groups[:-2] != groups[2:]
+            unsettled = numpy.unique(groups[~keep])
+            groups = groups[keep]
+
+        dropped = len(chain) - numpy.count_nonzero(keep)
+        chain = chain[keep]
+
+        if dropped == 0: #every middle point turns left, so the chain is already convex
+            return chain
+
+        if dropped <= CHAIN_PASS_MIN_DROP * (len(chain) + dropped):
+            break
+
+    settled = numpy.zeros(len(chain), dtype=bool) #entries the stack can skip
+    restarts = settled.copy() #entries that start a new group on the stack
+    if groups is not None:
+        if unsettled is not None:
+            settled = ~numpy.isin(groups, unsettled)
+        restarts[1:] = groups[1:] != groups[:-1]
+
+    rows = numpy.flatnonzero(~settled)
+    xs = points[chain[rows], 0].tolist()
+    ys = points[chain[rows], 1].tolist()
+    stack = []
+    bottom = 0 #stack entries below this belong to finished groups
+
+    for i, restart in enumerate(restarts[rows].tolist()): #every point is pushed and popped at most once
+
+        if restart:
+            bottom = len(stack)
+
+        while len(stack) >= bottom + 2 and (xs[stack[-1]] - xs[stack[-2]]) * (ys[i] - ys[stack[-2]]) - (ys[stack[-1]] - ys[stack[-2]]) * (xs[i] - xs[stack[-2]]) <= 0:
+            stack.pop()
+
+        stack.append(i)
+
+    settled[rows[stack]] = True
+
+    return chain[settled]
+
+def monotoneChain(points): #Andrew's monotone chain over an Nx2 coordinate array, O(nlogn) for the one sort and O(n) after it
+#returns the row indices of the hull vertices in clockwise order, starting from the leftmost point; collinear points and repeats are left out
+
+    points = numpy.asarray(points, dtype=float)
+    order = sortedDistinct(points)
+
+    if len(order) < 3:
+        return order
+
+    sortedPoints = points[order]
+    side = crossArray(sortedPoints[:1], sortedPoints[-1:], sortedPoints) #which side of the leftmost -> rightmost line each point is on
+
+    lowerMask = side < 0 #the lower chain only needs the points below that line, the upper chain the ones above it
+    upperMask = side > 0
+    lowerMask[[0, -1]] = True
+    upperMask[[0, -1]] = True
+
+    lower = halfChain(points, order[lowerMask]) #left to right
+    upper = halfChain(points, order[upperMask][::-1]) #right to left
+
+    counterclockwise = numpy.concatenate((lower[:-1], upper[:-1]))
+
+    return numpy.concatenate((counterclockwise[:1], counterclockwise[:0:-1]))
+
+def solver(points): #bottom-up divide and conquer over an Nx2 array already in sortedDistinct order; returns the Hull of all its rows
+#runs of 1, 2, 4, ... rows are merged pairwise, so there is no recursion and each level is O(n) link walking; O(nlogn) overall
+
+    hull = Hull(points)
+    n = len(points)
+    width = 1
+
+    while width < n:
+        for start in range(0, n - width, 2 * width):
+            hull.join(start + width - 1, start + width)
+        width *= 2
+
+    return hull
+
+def aklToussaint(points, shape='octagon'): #O(n) Akl-Toussaint prefilter; ascending row indices of the points that can still be hull vertices
+#the extreme points along each of the shape's axes are hull points, so anything strictly inside their polygon (a quadrilateral for 'quad', an
+#octagon for 'octagon') can't be a hull vertex and is dropped; every test is one vectorized pass over the points
+
+    if shape not in PREFILTER_DIRECTIONS:
+        raise ValueError('Unsupported prefilter shape: {}'.format(shape))
+
+    points = asPoints(points)
+    n = len(points)
+
+    if n < 4:
+        return numpy.arange(n)
+
+    extremes = []
+    for direction in PREFILTER_DIRECTIONS[shape]:
+        projection = points @ numpy.array(direction, dtype=float)
+        extremes += [projection.argmin(), projection.argmax()]
+
+    extremes = numpy.array(extremes)
+    corners = points[extremes[monotoneChain(points[extremes])]] #the extremes as a clockwise polygon, repeats and collinear ones left out
+
+    if len(corners) < 3: #all the extremes are on one line, so nothing is strictly inside
+        return numpy.arange(n)
+
+    inside = numpy.ones(n, dtype=bool)
+    for start, end in zip(corners, numpy.roll(corners, -1, axis=0)):
+        inside &= crossArray(start[None], end[None], points) < 0 #clockwise edges, so the interior is on their right
+
+    return numpy.flatnonzero(~inside)
+
+def computeHull(points, engine='chain', prefilter=None): #hull vertex row indices of points, clockwise from the leftmost (lowest on ties); collinear points and repeats are left out
+#points is anything asPoints accepts; points[computeHull(points)] gives the hull polygon's coordinates
+#engine='chain' runs monotoneChain, engine='divide' the divide and conquer solver; both return the same vertices
+#prefilter='quad' or 'octagon' first drops the points aklToussaint rules out, which for spread-out inputs is nearly all of them
+
+    if engine not in HULL_ENGINES:
+        raise ValueError('Unsupported hull engine: {}'.format(engine))
+
+    points = asPoints(points)
+
+    if prefilter is not None:
+        candidates = aklToussaint(points, prefilter)
+        return candidates[computeHull(points[candidates], engine)]
+
+    if engine == 'chain':
+        return monotoneChain(points)
+
+    order = sortedDistinct(points)
+
+    return order[numpy.fromiter(solver(points[order]), dtype=numpy.int64)] if len(order) else order
+
+def mergeHulls(points, lengths): #joins hulls stored back to back in points into one; returns its rows of points, clockwise from the leftmost
+#hull i is the next lengths[i] rows, clockwise from its leftmost vertex, and lies entirely left of (before, in sortedDistinct order) hull i + 1
+
+    order = sortedDistinct(points)
+    rank = numpy.empty(len(points), dtype=numpy.int64) #row of points -> row of the sorted Hull buffer
+    rank[order] = numpy.arange(len(order))
+    hull = Hull(points[order])
+    start = 0
+
+    for length in lengths: #each hull is a contiguous run of sorted rows, so the run before it ends at its leftmost row - 1
+        hull.link(rank[start:start + length].tolist())
+        if start:
+            hull.join(int(rank[start]) - 1, int(rank[start]))
+        start += length
+
+    return order[numpy.fromiter(hull, dtype=numpy.int64)]
+
+def _slabHull(args): #hull of one slab of parallelHull's shared point buffer, inside a pool worker; returns buffer rows, clockwise from the slab's leftmost
+
+    name, n, start, end, engine = args
+
+    block = shared_memory.SharedMemory(name=name)
+    points = numpy.ndarray((n, 2), dtype=float, buffer=block.buf)
+    slabHull = start + computeHull(points[start:end], engine)
+    del points #the buffer can't close while a view of it is alive
+    block.close()
+
+    return slabHull
+
+def parallelHull(points, processes=None, engine='chain'): #computeHull split into per-process x slabs over shared memory; returns the same indices
+#the points are grouped into slabs at x quantiles (equal x values always share a slab) with one O(n) gather straight into a shared_memory block;
+#pool workers compute their slab's hull (sort included) from that block, and only the slab hulls come back, to be merged left to right by mergeHulls
+
+    if engine not in HULL_ENGINES:
+        raise ValueError('Unsupported hull engine: {}'.format(engine))
+
+    points = asPoints(points)
+    processes = processes or multiprocessing.cpu_count()
+
+    if processes == 1 or len(points) < PARALLEL_MIN_POINTS:
+        return computeHull(points, engine)
+
+    cuts = numpy.quantile(points[:, 0], numpy.arange(1, processes) / processes) #O(n) selection, not a sort
+    slabs = numpy.searchsorted(cuts, points[:, 0], side='right').astype(numpy.uint16)
+    grouping = numpy.argsort(slabs, kind='stable') #radix sort on the small slab ids, O(n)
+    bounds = numpy.concatenate(([0], numpy.cumsum(numpy.bincount(slabs, minlength=processes))))
+
+    block = shared_memory.SharedMemory(create=True, size=max(points.nbytes, 1))
+    shared = None
+
+    try:
+        shared = numpy.ndarray(points.shape, dtype=float, buffer=block.buf)
+        numpy.take(points, grouping, axis=0, out=shared)
+
+        jobs = [(block.name, len(points), int(bounds[slab]), int(bounds[slab + 1]), engine) for slab in range(processes) if bounds[slab] < bounds[slab + 1]]
+
+        with multiprocessing.Pool(min(processes, len(jobs))) as pool:
+            slabHulls = pool.map(_slabHull, jobs)
+
+        vertices = numpy.concatenate(slabHulls)
+        vertexPoints = shared[vertices] #fancy indexing copies, so nothing is left pointing into the block
+    finally:
+        shared = None
+        block.close()
+        block.unlink()
+
+    return grouping[vertices[mergeHulls(vertexPoints, [len(slabHull) for slabHull in slabHulls])]]
+
+def _checkOffsets(offsets, n): #offsets as an int64 array, after checking they are CSR group bounds over n rows
+
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+
+    if offsets.ndim != 1 or len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != n or numpy.any(offsets[1:] < offsets[:-1]):
+        raise ValueError('Group offsets must be nondecreasing from 0 to the {} points'.format(n))
+
+    return offsets
+
+def _groupHulls(points, offsets): #batchHulls for one process; hull vertex rows of each group back to back, and the vertex count per group
+#one monotone chain over every group at once: a single lexsort keyed on the group, then both halves reduced by halfChain with group boundaries kept
+
+    groupCount = len(offsets) - 1
+
+    if len(points) == 0:
+        return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(groupCount, dtype=numpy.int64)
+
+    group = numpy.repeat(numpy.arange(groupCount), numpy.diff(offsets))
+
+    order = numpy.lexsort((points[:, 1], points[:, 0], group))
+    sortedPoints = points[order]
+    distinct = numpy.ones(len(order), dtype=bool) #sortedDistinct within each group
+    distinct[1:] = numpy.any(sortedPoints[1:] != sortedPoints[:-1], axis=1) | (group[order[1:]] != group[order[:-1]])
+    order = order[distinct]
+    sortedPoints = sortedPoints[distinct]
+    groups = group[order]
+
+    first = numpy.r_[True, groups[1:] != groups[:-1]]
+    last = numpy.r_[groups[1:] != groups[:-1], True]
+    leftmost = numpy.flatnonzero(first)[numpy.cumsum(first) - 1] #per row, the sorted position of its group's leftmost and rightmost rows
+    rightmost = numpy.flatnonzero(last)[numpy.cumsum(first) - 1]
+    side = crossArray(sortedPoints[leftmost], sortedPoints[rightmost], sortedPoints)
+
+    lowerMask = (side < 0) | first | last
+    upperMask = (side > 0) | first | last
+
+    lower = halfChain(points, order[lowerMask], groups[lowerMask]) #left to right within each group
+    upper = halfChain(points, order[upperMask][::-1], groups[upperMask][::-1])[::-1] #reduced right to left, flipped back to left to right
+
+    lowerBounds = group[lower[1:]] != group[lower[:-1]] #between the last entry of one group and the first of the next
+    lowerInner = numpy.zeros(len(lower), dtype=bool)
+    lowerInner[1:-1] = ~lowerBounds[:-1] & ~lowerBounds[1:]
+
+    #clockwise from the leftmost is the upper chain left to right, then the lower chain's inner vertices right to left
+    vertices = numpy.concatenate((upper, lower[lowerInner][::-1]))
+    vertices = vertices[numpy.argsort(group[vertices], kind='stable')]
+
+    return vertices, numpy.bincount(group[vertices], minlength=groupCount)
+
+def _batchSlab(args): #_groupHulls over one run of whole groups in batchHulls's shared point buffer, inside a pool worker
+
+    name, n, offsets = args
+
+    block = shared_memory.SharedMemory(name=name)
+    points = numpy.ndarray((n, 2), dtype=float, buffer=block.buf)
+    vertices, counts = _groupHulls(points[offsets[0]:offsets[-1]], offsets - offsets[0])
+    del points #the buffer can't close while a view of it is alive
+    block.close()
+
+    return offsets[0] + vertices, counts
+
+def batchHulls(points, offsets, processes=1): #hulls of many independent point groups in one call; returns (indices, hullOffsets) in CSR form
+#group i is rows offsets[i]:offsets[i + 1] of points (anything asPoints accepts); its hull is indices[hullOffsets[i]:hullOffsets[i + 1]], rows of points
+#in computeHull's order, so it matches offsets[i] + computeHull(points[offsets[i]:offsets[i + 1]]) without a Python call per group
+#processes > 1 (None for one per CPU) splits the groups into runs of about equal point counts, solved by pool workers over a shared_memory copy
+
+    points = asPoints(points)
+    offsets = _checkOffsets(offsets, len(points))
+    processes = processes or multiprocessing.cpu_count()
+
+    if processes == 1 or len(points) < BATCH_MIN_POINTS:
+        vertices, counts = _groupHulls(points, offsets)
+        return vertices, numpy.concatenate(([0], numpy.cumsum(counts)))
+
+    cuts = numpy.unique(numpy.searchsorted(offsets, numpy.arange(1, processes) * len(points) // processes)) #group bounds nearest each equal share
+    cuts = numpy.concatenate(([0], cuts[(cuts > 0) & (cuts < len(offsets) - 1)], [len(offsets) - 1]))
+
+    block = shared_memory.SharedMemory(create=True, size=max(points.nbytes, 1))
+    shared = None
+
+    try:
+        shared = numpy.ndarray(points.shape, dtype=float, buffer=block.buf)
+        shared[:] = points
+
+        jobs = [(block.name, len(points), offsets[start:end + 1]) for start, end in zip(cuts[:-1], cuts[1:])]
+
+        with multiprocessing.Pool(min(processes, len(jobs))) as pool:
+            runs = pool.map(_batchSlab, jobs)
+    finally:
+        shared = None
+        block.close()
+        block.unlink()
+
+    counts = numpy.concatenate([runCounts for _, runCounts in runs])
+
+    return numpy.concatenate([vertices for vertices, _ in runs]), numpy.concatenate(([0], numpy.cumsum(counts)))
+
+def turn(o, a, b): #z of (a - o) x (b - o) for (x, y) tuples; > 0 is a counterclockwise turn
+
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+class IncrementalHull: #hull of a growing point set, kept as two chains so each insertion only touches the chain it changes
+#both chains are lists of (x, y) tuples in sortedDistinct order, from the lexicographically smallest point to the largest: lower turns counterclockwise
+#and upper clockwise along that order. bisect finds the chain segment under or over a new point in O(log h), so an interior point is rejected
+#with two cross products; a point that does change a chain is spliced in and its now-concave neighbors are popped, amortized O(1) pops per insert
+
+    def __init__(self, points=None):
+        self.lower = []
+        self.upper = []
+        if points is not None:
+            self.extend(points)
+
+    def __len__(self): #hull vertex count
+        return max(len(self.lower) + len(self.upper) - 2, len(self.lower))
+
+    def insertChain(self, chain, point, sign): #adds point to chain (sign 1 = lower, -1 = upper) if it lies outside it; returns whether the chain changed
+
+        i = bisect.bisect_left(chain, point)
+
+        if i < len(chain) and chain[i] == point:
+            return False
+
+        if 0 < i < len(chain) and sign * turn(chain[i - 1], chain[i], point) >= 0: #on or inside the segment that spans it
+            return False
+
+        chain.insert(i, point)
+
+        while i >= 2 and sign * turn(chain[i - 2], chain[i - 1], point) <= 0: #neighbors the new point made concave
+            del chain[i - 1]
+            i -= 1
+
+        while i + 2 < len(chain) and sign * turn(point, chain[i + 1], chain[i + 2]) <= 0:
+            del chain[i + 1]
+
+        return True
+
+    def insert(self, point): #O(log h) for an interior point; returns False when the hull didn't change
+
+        point = (float(point[0]), float(point[1]))
+        lowerChanged = self.insertChain(self.lower, point, 1)
+        upperChanged = self.insertChain(self.upper, point, -1)
+
+        return lowerChanged or upperChanged
+
+    def interior(self, points): #vectorized mask of the rows of an Nx2 array strictly inside the current hull
+
+        inside = numpy.zeros(len(points), dtype=bool)
+
+        if len(self.lower) < 3 and len(self.upper) < 3: #no area yet
+            return inside
+
+        lower = numpy.array(self.lower)
+        upper = numpy.array(self.upper)
+        xs = points[:, 0]
+        between = (xs > lower[0, 0]) & (xs < lower[-1, 0]) #vertical edges only occur at the two ends, so every x in between lands on a proper segment
+        candidates = points[between]
+
+        below = numpy.searchsorted(lower[:, 0], candidates[:, 0], side='right') - 1
+        above = numpy.searchsorted(upper[:, 0], candidates[:, 0], side='right') - 1
+        aboveLower = crossArray(lower[below], lower[below + 1], candidates) > 0
+        belowUpper = crossArray(upper[above], upper[above + 1], candidates) < 0
+        inside[between] = aboveLower & belowUpper
+
+        return inside
+
+    def extend(self, points): #batch insert: one vectorized pass drops everything strictly inside, then the rest goes in one by one or, if there is
+    #a lot of it, the hull is rebuilt from its vertices plus the survivors with monotoneChain
+
+        points = asPoints(points)
+        survivors = points[~self.interior(points)]
+
+        if len(survivors) > INCREMENTAL_REBUILD_FRACTION * max(len(self), 1):
+            candidates = numpy.concatenate((self.vertices(), survivors))
+            self.setVertices(candidates[monotoneChain(candidates)])
+        else:
+            for point in survivors.tolist():
+                self.insert(point)
+
+    def setVertices(self, vertices): #replaces both chains with a hull given clockwise from its leftmost vertex, as computeHull orders it
+
+        vertices = [tuple(vertex) for vertex in numpy.asarray(vertices, dtype=float).tolist()]
+
+        if not vertices:
+            self.lower, self.upper = [], []
+            return
+
+        last = vertices.index(max(vertices)) #the lexicographically largest vertex ends both chains
+        self.upper = vertices[:last + 1]
+        self.lower = vertices[:1] + vertices[:last:-1] + [vertices[last]] if last else vertices[:1]
+
+    def vertices(self): #the current hull as an hx2 array, clockwise from the leftmost vertex; O(h)
+
+        return numpy.array(self.upper + self.lower[-2:0:-1], dtype=float).reshape(-1, 2)
+
+def openPoints(source, dtype=float): #memory-maps a point file without reading it: .npy files through numpy.load, anything else as raw x, y pairs of dtype
+
+    if str(source).endswith('.npy'):
+        points = numpy.load(source, mmap_mode='r')
+    else:
+        points = numpy.memmap(source, dtype=dtype, mode='r')
+
+    if points.ndim == 1: #flat files are x0, y0, x1, y1, ...; the reshape is still a view of the map
+        points = points.reshape(-1, 2)
+
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError('Point file {} must hold Nx2 coordinates, got shape {}'.format(source, points.shape))
+
+    return points
+
+def pointChunks(source, chunk_rows=STREAM_CHUNK_ROWS, dtype=float): #yields source in chunks of at most chunk_rows points
+#source is a file name (see openPoints), an Nx2 array or memmap (sliced, so only the current chunk is ever paged in), or any iterable of chunks
+
+    if isinstance(source, (str, os.PathLike)):
+        source = openPoints(source, dtype)
+
+    if hasattr(source, 'shape'):
+        for start in range(0, len(source), chunk_rows):
+            yield source[start:start + chunk_rows]
+    else:
+        for chunk in source:
+            yield chunk
+
+def streamHull(source, chunk_rows=STREAM_CHUNK_ROWS, dtype=float): #out-of-core hull; returns its vertices as an hx2 array, clockwise from the leftmost
+#each chunk goes through IncrementalHull.extend: points inside the running hull are dropped in one vectorized pass and the rest are merged with
+#the running hull's vertices, so memory is one chunk plus O(h) however large the input is
+
+    hull = IncrementalHull()
+
+    for chunk in pointChunks(source, chunk_rows, dtype):
+        hull.extend(chunk)
+
+    return hull.vertices()
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+#benchmarks for the TSP solver internals; run directly, results go to stdout
+
+import time
+import numpy as np
+from tsp_core import reduceCostMatrix, reduceCostArray
+
+def randomCostArray(n, seed=0): #random asymmetric cost matrix laid out like coreSolver.dist.T, the branch and bound's layout (rows=inbound, cols=outbound)
+
+	rng = np.random.RandomState(seed)
+	costArray = rng.randint(1, 10000, size=(n, n)).astype(float)
+	np.fill_diagonal(costArray, np.inf)
+
+	return costArray
+
+def toCostDict(costArray): #same matrix in the (row, col) dict form reduceCostMatrix takes
+
+	n = costArray.shape[0]
+
+	return {(row, col): costArray[row, col] for row in range(n) for col in range(n)}
+
+def benchReduction(sizes=(10, 20, 40, 80), repeats=5): #times one full reduction of the zero-state matrix in both representations
+
+	print('{:>6} {:>12} {:>12} {:>9}'.format('n', 'dict (ms)', 'ndarray (ms)', 'speedup'))
+
+	for n in sizes:
+		costArray = randomCostArray(n)
+		costDict = toCostDict(costArray)
+		path = [0, 1]
+
+		dictTimes = []
+		arrayTimes = []
+
+		for _ in range(repeats):
+			rcm = dict(costDict)
+			start = time.perf_counter()
+			_, dictBound = reduceCostMatrix(rcm, path, n)
+			dictTimes.append(time.perf_counter() - start)
+
+			rcm = costArray.copy()
+			start = time.perf_counter()
+			_, arrayBound = reduceCostArray(rcm, path)
+			arrayTimes.append(time.perf_counter() - start)
+
+			assert dictBound == arrayBound #both versions must produce the same lower bound
+
+		dictMs = min(dictTimes) * 1000
+		arrayMs = min(arrayTimes) * 1000
+		print('{:>6} {:>12.3f} {:>12.3f} {:>8.1f}x'.format(n, dictMs, arrayMs, dictMs / arrayMs))
+
+if __name__ == '__main__':
+	benchReduction()
@@ -0,0 +1,1884 @@
+#!/usr/bin/python3
+#headless TSP solver core: every algorithm in tsp.py over a plain cost matrix, importing nothing but numpy and the standard library
+#tsp.TSPSolver adapts coreSolver to the GUI's Scenario / City / TSPSolution objects; scripts and worker pools can use coreSolver directly
+
+import time
+import numpy as np
+import math
+import collections
+import zlib
+import multiprocessing
+import contextlib
+import json
+
+STATE_OVERHEAD = 400 #approximate bytes per queued state on top of its rcm (node, heap slot, matrix header)
+EVICT_KEEP = 0.75 #fraction of the queue cap kept when the worst-bound states are evicted
+NEIGHBOR_COUNT = 10 #candidate list length per city in localSearch
+MOVE_EPS = 1e-9 #smallest cost decrease localSearch counts as an improvement
+HELD_KARP_MAX_CITIES = 20 #branchAndBound hands scenarios up to this size to heldKarp
+HELD_KARP_INT_INF = 2 ** 31 - 1 #int32 sentinel for missing edges / unreachable subsets
+HELD_KARP_CHUNK = 1 << 16 #masks gathered at once per Held-Karp step
+ONE_TREE_ITERATIONS = 30 #subgradient steps per 1-tree bound
+ONE_TREE_PATIENCE = 5 #steps without improvement before the subgradient step size is halved
+PURGE_SAMPLE = 64 #queued states sampled to estimate how much of the queue a new bssf made stale
+PURGE_STALE_FRACTION = 0.25 #sampled stale fraction that triggers a purge
+PURGE_MIN_QUEUE = 256 #queues smaller than this are never purged; popping the stale states is cheaper
+CHECKPOINT_VERSION = 1 #bumped whenever the checkpoint layout changes
+GREEDY_BATCH_ROWS = 256 #nearest-neighbor tours built side by side in greedyTourBatch
+GREEDY_SEED_STARTS = 16 #start cities of the multi-start greedy tour that branchAndBound, anneal and fancy start from; O(GREEDY_SEED_STARTS * n^2)
+GREEDY_SEED_FRACTION = 0.1 #share of time_allowance that seed may take before single-start greedy is used instead
+SA_BLOCK = 1024 #annealing moves proposed per temperature update
+SA_EPOCHS = 10 #times the annealing chains stop to exchange tours
+SA_START_TEMPERATURE = 0.1 #starting temperature, as a fraction of the seed tour's mean edge cost
+SA_COOLING = 1e-3 #final temperature / starting temperature
+MAP_SCALE = 1000.0 #cost units per unit of map distance, same as City.MAP_SCALE
+BATCH_ALGORITHMS = ('defaultRandomTour', 'greedy', 'heldKarp', 'branchAndBound', 'anneal', 'fancy') #coreSolver methods solveBatch can run
+
+class stateNode:
+	__slots__ = ('depth', 'cost', 'bound', 'pathCost', 'parent', 'currCity', 'rcm', 'remaining', 'metric') #no per-state __dict__; there can be millions of these on the queue
+
+	def __init__(self, rcm, cost, parent, currCity, remaining, depth, pathCost=0):
+
+		self.depth = depth #depth of state
+		self.cost = cost  #reduced cost matrix lower bound
+		self.bound = cost #lower bound used for pruning and ordering; raised above cost when a stronger bounding strategy picks this state
+		self.pathCost = pathCost #actual cost of the edges in the partial path
+		self.parent = parent #state this one branched from; the partial path is shared through parent pointers instead of copied
+		self.currCity = currCity #current city is the last in partial path
+		self.rcm = rcm #reduced cost matrix of prev state; released once the state has been expanded
+		self.remaining = remaining #bitmask of remaining cities available for branching (bit i set => city i not yet visited)
+		self.metric = None #if PQ key is something other than cost, it is assigned in insert()
+
+	def getPartialPath(self): #O(depth) walk up the parent chain; array of city ids already visited
+
+		path = []
+		node = self
+
+		while node is not None:
+			path.append(node.currCity)
+			node = node.parent
+
+		path.reverse()
+
+		return path
+
+class stateHeap:
+
+	def __init__(self):
+		self.tree = []  #current stack of unevaluated states
+		self.length = 0  #num of states in tree
+		self.siftsUp = 0  #levels moved by insert(), for profiling
+		self.siftsDown = 0  #levels moved by deletemin()
+
+	def insert(self, newStateNode, c_d=False, naiveEst=None):  #o(logn) complexity; tree structure allows for faster sifting
+
+		newStateNode.metric = newStateNode.bound / newStateNode.depth
+
+		# o(1) operations###
+		self.tree.append(newStateNode)  # add to tree
+
+		self.length += 1  # increase length
+
+		index = self.length - 1  # index is last spot in tree
+
+		go_up = True
+		sifts = 0  #counted locally and stored once, so the sift loop pays for one increment
+
+		while go_up:  # will sift a maximum of logn times
+			# evey operation within while loop is o(1)
+			parent = self.tree[(index - 1) // 2]  # look at parent
+
+			if index == 0:  # root has been reached; sifting is complete
+
+				go_up = False
+
+			elif parent.metric > newStateNode.metric:  # if parent has larger value, switch
+
+				self.tree[(index)] = parent  # switch indices of parent and child
+
+				self.tree[(index - 1) // 2] = newStateNode
+
+				index = (index - 1) // 2  # update index to former parent position
+				sifts += 1
+
+			else:  # if parent isnt larger, work is complete
+
+				go_up = False
+
+		self.siftsUp += sifts
+
+	def deletemin(self):  # o(logn) worst case complexity shape
+		# o(1) operations####
+		index = 0
+		root = self.tree[0]  # deletemin value
+		lastNode = self.tree[self.length - 1]  # grab last value in tree
+		self.tree[0] = lastNode  # replace root with last value
+
+		go_down = True
+		sifts = 0
+
+		while go_down:
+
+			if index * 2 + 1 >= self.length:  # if no children, work is done
+
+				go_down = False
+
+			else:  # if children exist
+				childLeft = self.tree[index * 2 + 1]  # set left child
+
+				if index * 2 + 2 >= self.length:  # no right child; only check left
+
+					if lastNode.metric > childLeft.metric:  # if child is less, switch
+
+						self.tree[index * 2 + 1] = lastNode
+						self.tree[index] = childLeft
+
+						index = index * 2 + 1
+						sifts += 1
+
+					else:
+
+						go_down = False
+
+				else:  # else both children exist
+
+					childRight = self.tree[index * 2 + 2]  # set right child
+
+					if lastNode.metric == childRight.metric and lastNode.metric == childLeft.metric:  # if all equal, do nothing
+
+						go_down = False
+
+					elif lastNode.metric > childRight.metric and childLeft.metric >= childRight.metric:  # if right child is smallest of three, swap upper and right
+
+						self.tree[index * 2 + 2] = lastNode
+						self.tree[index] = childRight
+
+						index = index * 2 + 2
+						sifts += 1
+
+					elif lastNode.metric > childLeft.metric:  # if upper is greater than left, switch upper node with left child
+
+						self.tree[index * 2 + 1] = lastNode
+						self.tree[index] = childLeft
+
+						index = index * 2 + 1
+						sifts += 1
+
+					else:  # if upper node is smallest of three, work is done
+						go_down = False
+
+		self.siftsDown += sifts
+		self.length -= 1  # update tree size
+		self.tree.pop()  # remove last branch (where the sifting node formerly was)
+
+		return root
+
+	def evictWorst(self, keep): #O(nlogn); drops all but the keep states with the lowest bound, returns how many were dropped and the lowest bound among them
+
+		evicted = self.length - keep
+
+		if evicted <= 0:
+			return 0, np.inf
+
+		byBound = sorted(self.tree, key=lambda state: state.bound)
+		self.tree = sorted(byBound[:keep], key=lambda state: state.metric) #a list sorted on the key is already a valid heap
+		self.length = keep
+
+		return evicted, byBound[keep].bound
+
+	def purge(self, threshold): #O(n) bulk removal of every state with bound >= threshold; returns (states removed, rcm bytes released)
+
+		survivors = []
+		reclaimed = 0
+
+		for state in self.tree:
+			if state.bound < threshold:
+				survivors.append(state)
+			elif state.rcm is not None:
+				reclaimed += state.rcm.nbytes
+
+		purged = self.length - len(survivors)
+
+		if purged:
+			survivors.sort(key=lambda state: state.metric) #a list sorted on the key is already a valid heap
+			self.tree = survivors
+			self.length = len(survivors)
+
+		return purged, reclaimed
+
+	def staleFraction(self, threshold, samples): #O(samples) estimate of the fraction of states with bound >= threshold
+
+		if self.length == 0:
+			return 0.0
+
+		picks = np.random.randint(0, self.length, size=min(samples, self.length))
+
+		return sum(self.tree[i].bound >= threshold for i in picks) / len(picks)
+
+	def peekQueue(self): #debugging only, can technically be O(n!) if all potential states are on the queue
+
+		pathArray = []
+		costArray = []
+
+		for i in self.tree:
+
+			pathArray.append(i.getPartialPath())
+			costArray.append(i.bound)
+
+		return pathArray, costArray
+def reduceCostMatrix(rcm, path, n, prevCost=0): #O(n^2) operation that is used to estimate cost of unvisited cities
+
+	outbound, inbound = path #rows=inbound, cols=outbound
+	bound = 0
+
+	if (inbound, outbound) in rcm: #retreive edge cost, set reverse edge to inf
+
+		edgeCost = rcm[(inbound, outbound)]
+		rcm[(outbound, inbound)] = np.Inf
+
+	for inboundEntry in range(n): #set all row entries to infinite
+
+		rcm[(inbound, inboundEntry)] = np.Inf
+
+	for outboundEntry in range(n): #set all column entries to infinite
+
+		rcm[(outboundEntry, outbound)] = np.Inf
+
+	for row in range(n):  # ITERATE THRU ROWS####
+
+		rowMin = np.Inf #curr minimum is infinite
+
+		for entry in range(n): #find min in row
+
+			currEntry = rcm[(row, entry)]
+
+			if currEntry < rowMin: #update rowMin when necessary
+				rowMin = currEntry
+
+		if rowMin < np.Inf: #if min < Inf, edit entries
+
+			bound += rowMin #update total bound
+
+			for entry in range(n): #subtract min from all entries
+
+				rcm[(row, entry)] = rcm[(row, entry)] - rowMin
+
+	for col in range(n):  # ITERATE THRU COLS####
+
+		colMin = np.Inf
+
+		for entry in range(n): #find min in column
+
+			currEntry = rcm[(entry, col)]
+
+			if currEntry < colMin:
+				colMin = currEntry #update min when applicable
+
+		if colMin < np.Inf: #if row isnt all Infs,
+
+			bound += colMin #update bound,
+
+			for entry in range(n): #and subtract column entries
+
+				rcm[(entry, col)] = rcm[(entry, col)] - colMin
+
+	bound = edgeCost + bound + prevCost #lowerbound = edgeCost(i,j) + addedEstimate + prevStateEstimate
+
+	return rcm, bound
+
+def reduceCostArray(rcm, path, prevCost=0): #ndarray version of reduceCostMatrix; still O(n^2), but every pass is a vectorized numpy op
+	#rcm is an nxn float ndarray (rows=inbound, cols=outbound) and is reduced in place
+
+	outbound, inbound = path
+
+	edgeCost = rcm[inbound, outbound] #retreive edge cost, set reverse edge to inf
+	rcm[outbound, inbound] = np.inf
+	rcm[inbound, :] = np.inf #mask the inbound row
+	rcm[:, outbound] = np.inf #mask the outbound column
+
+	rowMins = rcm.min(axis=1) #min of every row at once
+	rowMins[rowMins == np.inf] = 0 #rows that are all Infs are left alone
+	rcm -= rowMins[:, np.newaxis] #Inf - finite stays Inf, so masked entries survive the subtraction
+
+	colMins = rcm.min(axis=0) #same for columns, on the row-reduced matrix
+	colMins[colMins == np.inf] = 0
+	rcm -= colMins[np.newaxis, :]
+
+	bound = edgeCost + rowMins.sum() + colMins.sum() + prevCost #lowerbound = edgeCost(i,j) + addedEstimate + prevStateEstimate
+
+	return rcm, bound
+
+def pointCostArray(points, elevations=None, edges=None, scale=MAP_SCALE): #O(n^2) cost matrix for an Nx2 array of city coordinates; rows=from, cols=to
+	#elevations adds the asymmetric climb term of the non-Easy difficulties (costs clamp at 0); edges is an nxn boolean mask of the edges that exist
+
+	points = np.asarray(points, dtype=float)
+	xs = points[:, 0]
+	ys = points[:, 1]
+
+	cost = np.sqrt((xs[np.newaxis, :] - xs[:, np.newaxis]) ** 2 + (ys[np.newaxis, :] - ys[:, np.newaxis]) ** 2) #Euclidean distance
+
+	if elevations is not None: #climbing costs extra, descending refunds it
+		elevations = np.asarray(elevations, dtype=float)
+		cost = np.maximum(cost + (elevations[np.newaxis, :] - elevations[:, np.newaxis]), 0.0)
+
+	cost = np.ceil(cost * scale)
+
+	if edges is not None:
+		cost[~np.asarray(edges, dtype=bool)] = np.inf #removed edges
+	np.fill_diagonal(cost, np.inf)
+
+	return cost
+
+def randomTourBatch(dist, batchSize): #batchSize random permutations scored together with one gather; O(batchSize * n)
+	#returns (tours, costs) with one tour per row; dist is rows=from, cols=to
+
+	n = dist.shape[0]
+	tours = np.argsort(np.random.random((batchSize, n)), axis=1) #row-wise random permutations
+	costs = dist[tours, np.roll(tours, -1, axis=1)].sum(axis=1)
+
+	return tours, costs
+
+def greedyTourBatch(dist, starts, deadline=None): #nearest-neighbor tours from every start city at once, O(n^2) vectorized work per step
+	#returns (tours, costs) like randomTourBatch; a start that gets stuck ends up with an Inf cost, and so does every start once time.time() passes deadline
+
+	n = dist.shape[0]
+	starts = np.asarray(starts)
+	rows = np.arange(len(starts))
+	tours = np.empty((len(starts), n), dtype=int)
+	tours[:, 0] = starts
+	visited = np.zeros((len(starts), n), dtype=bool)
+	visited[rows, starts] = True
+	costs = np.zeros(len(starts))
+	currCities = starts
+
+	for step in range(1, n):
+		if deadline is not None and time.time() > deadline: #no tour in the batch is complete
+			return tours, np.full(len(starts), np.inf)
+		edges = dist[currCities] #every tour's next-city candidates as one (tours x n) block
+		edges[visited] = np.inf
+		nextCities = np.argmin(edges, axis=1)
+		costs += edges[rows, nextCities]
+		tours[:, step] = nextCities
+		visited[rows, nextCities] = True
+		currCities = nextCities
+
+	costs += dist[currCities, starts] #close the cycle
+
+	return tours, costs
+
+def tourCost(costArray, path): #O(n) cost of the closed tour through path, read from a rows=inbound cost matrix
+
+	path = np.asarray(path)
+
+	return costArray[np.roll(path, -1), path].sum()
+
+def stateBudget(memory_budget, n): #how many queued states fit in memory_budget bytes; each one is dominated by its nxn float64 rcm
+
+	return max(1, int(memory_budget // (n * n * 8 + STATE_OVERHEAD)))
+
+class reductionBound: #default bounding strategy: the reduced cost matrix bound alone, which every state already carries
+
+	name = 'reduction'
+
+	def picks(self, state): #does state get this strategy's bound on top of its reduction bound?
+		return False
+
+	def bound(self, state, target):
+		return state.cost
+
+class oneTreeBound: #Held-Karp Lagrangian bound: minimum 1-trees over the unvisited cities, node penalties tuned by subgradient ascent
+	#the fixed partial path is contracted into one special node (leave currCity, come back into city 0) with degree exactly 2
+	#edges between unvisited cities take the cheaper of their two directions, so the bound also holds for asymmetric costs
+
+	name = 'onetree'
+
+	def __init__(self, dist, iterations=ONE_TREE_ITERATIONS, maxDepth=None):
+
+		self.dist = dist #rows=from, cols=to
+		self.symmetric = np.minimum(dist, dist.T)
+		self.iterations = iterations #subgradient steps per state
+		self.maxDepth = maxDepth #only states this shallow pick the 1-tree; None for every state
+
+	def picks(self, state): #worth it while at least two cities remain and the state is shallow enough for pruning to save a big subtree
+
+		return state.remaining & (state.remaining - 1) != 0 and (self.maxDepth is None or state.depth <= self.maxDepth)
+
+	def bound(self, state, target): #O(iterations * k^2) for k unvisited cities; stops early once the bound reaches target
+
+		remaining = state.remaining
+		cities = []
+		while remaining:
+			bit = remaining & -remaining
+			remaining ^= bit
+			cities.append(bit.bit_length() - 1)
+
+		leave = self.dist[state.currCity, cities] #special node's outbound edge
+		enter = self.dist[cities, 0] #special node's inbound edge
+		weights = self.symmetric[np.ix_(cities, cities)]
+		budget = target - state.pathCost #what the rest of the tour would have to beat
+
+		penalties = np.zeros(len(cities))
+		best = -np.inf
+		stepScale = 2.0
+		stalled = 0
+
+		for iteration in range(self.iterations):
+
+			treeCost, degrees = minimumSpanningTree(weights + penalties[:, np.newaxis] + penalties[np.newaxis, :])
+			leaveCosts = leave + penalties
+			enterCosts = enter + penalties
+			out, back = specialEdges(leaveCosts, enterCosts)
+			lagrangian = treeCost + leaveCosts[out] + enterCosts[back] - 2 * penalties.sum()
+
+			if lagrangian == np.inf: #no spanning tree at all, so no way to finish the tour
+				return np.inf
+
+			if lagrangian > best:
+				best = lagrangian
+				stalled = 0
+			else:
+				stalled += 1
+				if stalled >= ONE_TREE_PATIENCE:
+					stepScale /= 2
+					stalled = 0
+
+			if best >= budget:
+				break
+
+			degrees[out] += 1
+			degrees[back] += 1
+			subgradient = degrees - 2
+			norm = (subgradient * subgradient).sum()
+
+			if norm == 0: #the 1-tree is a tour, so the bound is exact
+				break
+
+			gap = budget - lagrangian if budget < np.inf else abs(lagrangian) * 0.05 + 1
+			penalties += stepScale * gap / norm * subgradient
+
+		return state.pathCost + best
+
+def minimumSpanningTree(weights): #O(k^2) Prim over a dense symmetric matrix; returns (total weight, degree of every node)
+
+	k = weights.shape[0]
+	inTree = np.zeros(k, dtype=bool)
+	inTree[0] = True
+	key = weights[0].copy() #cheapest edge into the tree for every node
+	attach = np.zeros(k, dtype=int)
+	degrees = np.zeros(k)
+	total = 0.0
+
+	for _ in range(k - 1):
+		node = int(np.argmin(np.where(inTree, np.inf, key)))
+		total += key[node]
+		degrees[node] += 1
+		degrees[attach[node]] += 1
+		inTree[node] = True
+
+		closer = weights[node] < key
+		key = np.where(closer, weights[node], key)
+		attach = np.where(closer, node, attach)
+
+	return total, degrees
+
+def specialEdges(leaveCosts, enterCosts): #cheapest (out, back) pair for the contracted node, which has to use two different cities
+
+	out = int(np.argmin(leaveCosts))
+	back = int(np.argmin(enterCosts))
+
+	if out != back:
+		return out, back
+
+	enterOthers = enterCosts.copy()
+	enterOthers[out] = np.inf
+	leaveOthers = leaveCosts.copy()
+	leaveOthers[back] = np.inf
+	otherBack = int(np.argmin(enterOthers))
+	otherOut = int(np.argmin(leaveOthers))
+
+	if leaveCosts[out] + enterOthers[otherBack] <= leaveOthers[otherOut] + enterCosts[back]:
+		return out, otherBack
+
+	return otherOut, back
+
+def makeBound(bound, dist): #maps branchAndBound's bound argument to a strategy object; strategy objects pass through
+
+	if bound == 'reduction':
+		return reductionBound()
+	if bound == 'onetree':
+		return oneTreeBound(dist)
+	if hasattr(bound, 'picks') and hasattr(bound, 'bound'):
+		return bound
+
+	raise ValueError('Unsupported bound: {}'.format(bound))
+
+class searchProfiler: #opt-in instrumentation; pass one as profiler= to branchAndBound, greedy or fancy and read report() / toJSON() afterwards
+	#solvers only look it up when one is given, so an unprofiled run pays at most a None check per prune
+
+	def __init__(self):
+		self.times = {} #phase -> seconds spent in it (summed across worker processes)
+		self.calls = {} #phase -> times it was entered
+		self.counters = {} #name -> running total, e.g. expanded states or heap sifts
+		self.pruneDepths = {} #depth -> states pruned at that depth
+		self.openPhases = set() #phases being timed right now
+
+	def add(self, phase, seconds, calls=1):
+
+		self.times[phase] = self.times.get(phase, 0.0) + seconds
+		self.calls[phase] = self.calls.get(phase, 0) + calls
+
+	def count(self, name, amount=1):
+
+		self.counters[name] = self.counters.get(name, 0) + amount
+
+	def pruned(self, depth, amount=1):
+
+		self.pruneDepths[depth] = self.pruneDepths.get(depth, 0) + amount
+
+	@contextlib.contextmanager
+	def phase(self, name): #times a with-block; meant for coarse phases, hot calls go through timed()
+		#a phase entered again from inside itself (fancy -> greedy both timing 'total') is only counted by the outer block
+
+		if name in self.openPhases:
+			yield
+			return
+
+		self.openPhases.add(name)
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.add(name, time.perf_counter() - start)
+			self.openPhases.discard(name)
+
+	def timed(self, phase, function): #wraps function so every call is charged to phase
+
+		times = self.times
+		calls = self.calls
+
+		def timedFunction(*args, **kwargs):
+			start = time.perf_counter()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				times[phase] = times.get(phase, 0.0) + time.perf_counter() - start
+				calls[phase] = calls.get(phase, 0) + 1
+
+		return timedFunction
+
+	def merge(self, report): #folds in another profiler's report(), e.g. one sent back by a pool worker
+
+		for phase, stats in report['phases'].items():
+			self.add(phase, stats['time'], stats['calls'])
+		for name, amount in report['counters'].items():
+			self.count(name, amount)
+		for depth, amount in report['prune_depths'].items():
+			self.pruned(int(depth), amount)
+
+	def report(self): #plain dict of everything collected; rates are per second of the 'total' phase, when it was timed
+
+		elapsed = self.times.get('total', 0.0)
+
+		return {'phases': {phase: {'time': self.times[phase], 'calls': self.calls[phase]} for phase in self.times},
+				'counters': dict(self.counters),
+				'rates': {name + '_per_sec': amount / elapsed for name, amount in self.counters.items()} if elapsed > 0 else {},
+				'prune_depths': {depth: self.pruneDepths[depth] for depth in sorted(self.pruneDepths)}}
+
+	def toJSON(self, filename=None): #report() as JSON text; also written to filename if one is given
+
+		text = json.dumps(self.report(), indent=2)
+
+		if filename is not None:
+			with open(filename, 'w') as profileFile:
+				profileFile.write(text)
+
+		return text
+
+def untimed(phase, function): #stand-in for searchProfiler.timed when profiling is off; hands back function itself
+
+	return function
+
+def untimedPhase(name): #stand-in for searchProfiler.phase when profiling is off
+
+	return contextlib.nullcontext()
+
+class branchSearch: #best-first branch-and-bound loop over a cost matrix; holds no City objects so it can run inside worker processes
+
+	def __init__(self, costArray, bssfPath, bssfCost, time_allowance, start_time=None, sharedBound=None, maxStates=None, overflow='evict', bounder=None, profiler=None):
+
+		if overflow not in ('evict', 'dive'):
+			raise ValueError('Unsupported overflow mode: {}'.format(overflow))
+
+		self.costArray = costArray #zero-state cost matrix (rows=inbound, cols=outbound)
+		self.n = costArray.shape[0] #problem size
+		self.naiveEst = self.n * 785
+		self.bssfPath = bssfPath #city ids of the best solution so far
+		self.bssfCost = bssfCost
+		self.sharedBound = sharedBound #multiprocessing.Value with the global bssf cost, or None when searching alone
+		self.time_allowance = time_allowance
+		self.start_time = time.time() if start_time is None else start_time
+		self.pathQueue = stateHeap() #create PQ object
+		self.maxStates = maxStates #queue cap, None for unbounded
+		self.overflow = overflow #what to do at the cap: 'evict' the worst-bound states, or 'dive' depth-first without queueing
+		self.bounder = reductionBound() if bounder is None else bounder #bounding strategy states can pick on top of the reduction bound
+		self.profiler = profiler #searchProfiler, or None
+
+		timed = profiler.timed if profiler is not None else untimed #the hot calls are bound once here, timed or not, so the loop itself never checks
+		self.reduce = timed('reduce', reduceCostArray)
+		self.copyRcm = timed('copy', np.copyto)
+		self.insertState = timed('heap', stateHeap.insert)
+		self.popState = timed('heap', stateHeap.deletemin)
+		self.boundState = timed('bound', self.bounder.bound)
+		self.evaluateLeaf = timed('leaf', self.offerSolution)
+
+		self.totSolutions = 0 #init all reporting variables here###
+		self.maxQueueSize = 0
+		self.prunedStates = 0
+		self.totStates = 0
+		self.evictedStates = 0
+		self.droppedBound = np.inf #lowest bound of any state evicted or dropped by a dive; lowerBound has to count them, as they left the queue unexplored
+		self.boundPruned = 0 #children the reduction bound kept but the bounding strategy pruned
+		self.purgedStates = 0 #stale states removed in bulk after a bssf improvement (also counted in prunedStates)
+		self.reclaimedBytes = 0
+		self.purgeTime = 0.0
+		self.expandedStates = 0 #states dequeued and branched on
+		self.improved = False #set by offerSolution, cleared by improvements()
+		self.timeOut = False
+
+	def seed(self): #O(n^3logn), init queue with all possible starting edges
+
+		n = self.n
+		remainingCities = ((1 << n) - 1) ^ 1 #the rest of the cities are candidates for next path
+		rootState = stateNode(None, 0, None, 0, remainingCities, depth=0) #shared head of every partial path
+
+		self.totStates += n - 1 #init total states with zero-state branch (n-1)
+
+		for firstEdge in range(1, n): #space complexity is O(1), immediately sending stateNode() objs to queue, rcms dont change size
+
+			rcm, currCost = self.reduce(self.costArray.copy(), [0, firstEdge]) #time/space of n^2; nxn matrix, evaluates all entries
+
+			child = self.makeChild(rootState, firstEdge, 1 << firstEdge, rcm, currCost)
+
+			if child is not None: #if eligible,
+				self.push(child) #create new state
+
+		self.trimToCap()
+
+	def trimToCap(self): #evicts the worst-bound states down to maxStates; dive mode never trims in push, so whatever queues states wholesale calls this
+
+		if self.maxStates is not None and self.pathQueue.length > self.maxStates:
+			self.evict(self.maxStates)
+
+	def evict(self, keep): #pathQueue.evictWorst down to keep states, counted and with their best bound remembered
+
+		evicted, bound = self.pathQueue.evictWorst(keep)
+		self.evictedStates += evicted
+		self.drop(bound)
+
+	def drop(self, bound): #records the bound of a state that leaves the search unexplored (evicted, or a dive's sibling)
+
+		self.droppedBound = min(self.droppedBound, bound)
+
+	def push(self, state): #insert candidate state into PQ; takes c_d, naiveEst parameters for different priority approaches, logn insert
+
+		self.insertState(self.pathQueue, state, c_d=True, naiveEst=self.naiveEst)
+
+		if self.overflow == 'evict' and self.maxStates is not None and self.pathQueue.length > self.maxStates: #beam-style trim back below the cap
+			self.evict(int(self.maxStates * EVICT_KEEP))
+
+	def refreshBound(self): #pick up improvements other workers have published; O(1)
+
+		if self.sharedBound is not None and self.sharedBound.value < self.bssfCost:
+			self.bssfCost = self.sharedBound.value
+			self.bssfPath = None #the tour itself lives in the worker that found it
+			self.compact()
+
+	def compact(self): #called whenever the bssf improves; purges the queue only if a sample says enough of it went stale
+
+		if self.pathQueue.length < PURGE_MIN_QUEUE or self.pathQueue.staleFraction(self.bssfCost, PURGE_SAMPLE) < PURGE_STALE_FRACTION:
+			return
+
+		if self.profiler is not None:
+			for state in self.pathQueue.tree:
+				if state.bound >= self.bssfCost:
+					self.profiler.pruned(state.depth)
+
+		purgeStart = time.time()
+		purged, reclaimed = self.pathQueue.purge(self.bssfCost)
+		self.purgeTime += time.time() - purgeStart
+		self.purgedStates += purged
+		self.prunedStates += purged
+		self.reclaimedBytes += reclaimed
+
+	def offerSolution(self, path): #O(n) evaluation of a leaf
+
+		cost = tourCost(self.costArray, path)
+		self.totSolutions += 1
+
+		if cost < self.bssfCost: #if better than bssf,
+			self.totSolutions += 1
+			self.bssfPath = path # assign to bssf
+			self.bssfCost = cost
+			self.improved = True
+
+			if self.sharedBound is not None: #broadcast the new bound to every other worker
+				with self.sharedBound.get_lock():
+					if cost < self.sharedBound.value:
+						self.sharedBound.value = cost
+
+			self.compact()
+
+	def makeChild(self, currState, nextCity, nextCityBit, rcm, currCost): #bounds a reduced child; returns its stateNode, or None (ticking prunedStates) if it can't beat the bssf
+
+		if currCost >= self.bssfCost: #reduction bound alone rules it out
+			self.prunedStates += 1
+			if self.profiler is not None:
+				self.profiler.pruned(currState.depth + 1)
+			return None
+
+		pathCost = currState.pathCost + self.costArray[nextCity, currState.currCity]
+		child = stateNode(rcm, currCost, currState, nextCity, currState.remaining ^ nextCityBit, depth=currState.depth + 1, pathCost=pathCost)
+
+		if self.bounder.picks(child): #the child decides whether the stronger (and slower) bound is worth computing
+			child.bound = max(currCost, self.boundState(child, self.bssfCost))
+
+			if child.bound >= self.bssfCost:
+				self.prunedStates += 1
+				self.boundPruned += 1
+				if self.profiler is not None:
+					self.profiler.pruned(child.depth)
+				return None
+
+		return child
+
+	def expand(self, currState): #EVALUATE ALL CHILDREN STATES, O(n^3); maximum of n descendants, each has rcm
+
+		self.expandedStates += 1
+
+		if currState.remaining == 0: #WHEN ALL CITIES ARE IN PATH, LEAF HAS BEEN ENCOUNTERED
+			self.evaluateLeaf(currState.getPartialPath())
+
+		scratchRcm = np.empty_like(currState.rcm) #children are reduced in here; it is only handed off (not copied) when a child passes the bound
+		candidateCities = currState.remaining
+
+		while candidateCities:
+			#constant time space complexity, iteration values are replaced each time, stored value is sent to PQ
+			self.totStates += 1 #total states counter
+			nextCityBit = candidateCities & -candidateCities #lowest remaining city
+			candidateCities ^= nextCityBit
+			nextCity = nextCityBit.bit_length() - 1
+
+			self.copyRcm(scratchRcm, currState.rcm) #parent rcm is never modified, so no defensive copy is needed
+			rcm, currCost = self.reduce(scratchRcm, [currState.currCity, nextCity], currState.cost) #evaulate current path, O(n^2)
+
+			child = self.makeChild(currState, nextCity, nextCityBit, rcm, currCost) #only add to queue if partial path is a candidate (< bssf)
+
+			if child is not None:
+				self.push(child)
+				scratchRcm = np.empty_like(rcm) #the child owns the old buffer now
+
+			if time.time() - self.start_time > self.time_allowance: #if time allowance is reached, quit loop
+				self.timeOut = True
+
+		currState.rcm = None #children only need the parent for its path, so drop the O(n^2) matrix
+
+	def dive(self, currState): #depth-first plunge used while the queue is full; follows the best child, drops its siblings
+		#O(n^4) for a full dive (n levels of O(n^3) expansions), and nothing new is queued
+
+		while currState is not None and not self.timeOut:
+
+			self.expandedStates += 1
+
+			if currState.remaining == 0: #reached a leaf
+				self.evaluateLeaf(currState.getPartialPath())
+				break
+
+			bestChild = None
+			scratchRcm = np.empty_like(currState.rcm)
+			candidateCities = currState.remaining
+
+			while candidateCities:
+				self.totStates += 1
+				nextCityBit = candidateCities & -candidateCities
+				candidateCities ^= nextCityBit
+				nextCity = nextCityBit.bit_length() - 1
+
+				self.copyRcm(scratchRcm, currState.rcm)
+				rcm, currCost = self.reduce(scratchRcm, [currState.currCity, nextCity], currState.cost)
+
+				child = self.makeChild(currState, nextCity, nextCityBit, rcm, currCost)
+
+				if child is None:
+					pass
+				elif bestChild is None or child.bound < bestChild.bound: #new best child; the previous one is dropped
+					if bestChild is not None:
+						self.evictedStates += 1
+						self.drop(bestChild.bound)
+					bestChild = child
+					scratchRcm = np.empty_like(rcm)
+				else:
+					self.evictedStates += 1
+					self.drop(child.bound)
+
+				if time.time() - self.start_time > self.time_allowance:
+					self.timeOut = True
+
+			currState.rcm = None
+			currState = bestChild
+
+		if currState is not None and currState.remaining and self.timeOut: #time ran out with the dive's next state unexplored
+			self.drop(currState.bound)
+
+	def step(self): #dequeue and process a single state
+
+		currState = self.popState(self.pathQueue) #GET NEXT STATE FROM QUEUE (deletemin() is a O(logn) procedure)
+
+		if self.pathQueue.length > self.maxQueueSize: #update maxQueue if necessary
+
+			self.maxQueueSize = self.pathQueue.length
+
+		self.refreshBound()
+
+		if currState.bound > self.bssfCost: #if currState cost < bssf, skip it (can happen if bssf has been updated since last eval)
+
+			self.prunedStates += 1
+			if self.profiler is not None:
+				self.profiler.pruned(currState.depth)
+			return
+
+		if self.overflow == 'dive' and self.maxStates is not None and self.pathQueue.length + bin(currState.remaining).count('1') > self.maxStates: #its children might not fit
+			self.dive(currState)
+		else:
+			self.expand(currState)
+
+	def improvements(self): #quit if optimal is found, or if time limit is reached; yields the new bssf path after every step that improved it
+		#pathQueue can *technically* see n*n! total state objects (n! possible solutions, n intermediate states), and 1 is evaluated per loop; so n*n! potential loops
+		#the loop through children to find eligible extended paths is potentially O(n^3), making this routing O(n^4*n!*logn)
+		#while this is technically worse than a brute force O(n!), we use these child loops to significantly prune branches
+		#(empirically much faster than O(n!)
+
+		while self.pathQueue.length > 0 and not self.timeOut:
+			self.step()
+
+			if self.improved:
+				self.improved = False
+				yield self.bssfPath
+
+	def run(self): #runs the search to the end without stopping at improvements
+
+		for _ in self.improvements():
+			pass
+
+	def lowerBound(self): #O(queue) lower bound on the optimal tour: every open state is either on the queue or was dropped, and none can beat its bound
+		#evicted and dived-past states count through droppedBound, so with a memory_budget the gap can stay open after the queue empties
+
+		bound = min(self.bssfCost, self.droppedBound)
+
+		if self.pathQueue.length == 0: #search finished; the bssf is optimal unless something was dropped
+			return bound
+
+		return min(bound, min(state.bound for state in self.pathQueue.tree))
+
+	counterAttributes = {'count': 'totSolutions', 'max': 'maxQueueSize', 'total': 'totStates', 'pruned': 'prunedStates', 'evicted': 'evictedStates',
+		'bound_pruned': 'boundPruned', 'purged': 'purgedStates', 'reclaimed_bytes': 'reclaimedBytes', 'purge_time': 'purgeTime'} #results key -> attribute
+
+	def counters(self): #reporting metrics, in the same keys as the results dict
+
+		return {key: getattr(self, attribute) for key, attribute in self.counterAttributes.items()}
+
+	def recordProfile(self): #adds the search's totals and its queue's sift counts to the profiler; call once, when the search is done with its queue
+
+		if self.profiler is None:
+			return
+
+		self.profiler.count('states', self.totStates)
+		self.profiler.count('expanded', self.expandedStates)
+		self.profiler.count('sift_up', self.pathQueue.siftsUp)
+		self.profiler.count('sift_down', self.pathQueue.siftsDown)
+
+	def checksum(self): #identifies the cost matrix a checkpoint belongs to
+
+		return zlib.crc32(np.ascontiguousarray(self.costArray).tobytes())
+
+	def frontierArrays(self): #O(queue * n); every queued state as its path plus bound, paths stored CSR style (flat city ids + offsets)
+
+		paths = [state.getPartialPath() for state in self.pathQueue.tree]
+		offsets = np.cumsum([0] + [len(path) for path in paths])
+		flat = np.array([city for path in paths for city in path], dtype=np.int32)
+		bounds = np.array([state.bound for state in self.pathQueue.tree], dtype=float)
+
+		return flat, offsets, bounds
+
+	def saveCheckpoint(self, filename, frontier=None, counters=None): #compact .npz of the frontier, bssf and counters; no matrices are stored
+		#frontier/counters default to this search's own; parallel mode passes in the merged ones from its workers
+
+		flat, offsets, bounds = frontier if frontier is not None else self.frontierArrays()
+		counters = counters if counters is not None else self.counters()
+
+		with open(filename, 'wb') as checkpointFile: #a file object keeps numpy from appending .npz to the name
+			np.savez_compressed(checkpointFile, version=CHECKPOINT_VERSION, n=self.n, checksum=self.checksum(),
+								bssf_path=np.array(self.bssfPath if self.bssfPath is not None else [], dtype=np.int32), bssf_cost=self.bssfCost,
+								paths=flat, offsets=offsets, bounds=bounds,
+								counter_names=np.array(list(counters)), counter_values=np.array(list(counters.values()), dtype=float))
+
+	def loadCheckpoint(self, filename): #restores a saveCheckpoint file in place of seed(); counters carry on from the saved run
+
+		with np.load(filename) as data:
+
+			if int(data['version']) != CHECKPOINT_VERSION:
+				raise ValueError('Unsupported checkpoint version: {}'.format(int(data['version'])))
+			if int(data['n']) != self.n or int(data['checksum']) != self.checksum():
+				raise ValueError('Checkpoint {} was written for a different scenario'.format(filename))
+
+			if float(data['bssf_cost']) < self.bssfCost: #keep whichever bssf is better, the saved one or the fresh seed
+				self.bssfCost = float(data['bssf_cost'])
+				self.bssfPath = data['bssf_path'].tolist()
+
+			for key, value in zip(data['counter_names'].tolist(), data['counter_values'].tolist()):
+				attribute = self.counterAttributes[key]
+				setattr(self, attribute, type(getattr(self, attribute))(value))
+
+			if self.evictedStates > 0: #the saved run dropped states whose bounds weren't kept, so no lower bound can be claimed
+				self.droppedBound = -np.inf
+
+			self.restoreFrontier(data['paths'], data['offsets'], data['bounds'])
+
+	def restoreFrontier(self, flat, offsets, bounds): #O(states * n^2); rebuilds each saved state's rcm by replaying its path's reductions
+		#paths are replayed in sorted order along one chain of states, so shared prefixes are reduced once and at most n matrices are live
+
+		paths = [flat[offsets[i]:offsets[i + 1]].tolist() for i in range(len(bounds))]
+		rootState = stateNode(self.costArray, 0, None, 0, ((1 << self.n) - 1) ^ 1, depth=0) #the zero-state matrix reduces into the first edges, like seed()
+		chain = [rootState]
+		queued = set()
+
+		for index in sorted(range(len(paths)), key=lambda i: paths[i]):
+			path = paths[index]
+			shared = 1
+
+			while shared < min(len(chain), len(path)) and chain[shared].currCity == path[shared]:
+				shared += 1
+
+			while len(chain) > shared: #leave the prefix this path doesn't share
+				dropped = chain.pop()
+				if id(dropped) not in queued:
+					dropped.rcm = None
+
+			for city in path[len(chain):]:
+				parent = chain[-1]
+				rcm, cost = self.reduce(parent.rcm.copy(), [parent.currCity, city], parent.cost)
+				chain.append(stateNode(rcm, cost, parent, city, parent.remaining ^ (1 << city), depth=parent.depth + 1,
+									   pathCost=parent.pathCost + self.costArray[city, parent.currCity]))
+
+			state = chain[-1]
+			state.bound = max(state.cost, bounds[index]) #the saved bound may come from a stronger bounding strategy
+			queued.add(id(state))
+			self.push(state)
+
+		for state in chain:
+			if id(state) not in queued:
+				state.rcm = None
+
+		self.trimToCap() #a checkpoint from a run with a larger budget may hold more states than this one allows
+
+_workerBound = None #the shared bssf cost, installed in each pool worker by _initBranchWorker
+
+def _initBranchWorker(sharedBound):
+
+	global _workerBound
+	_workerBound = sharedBound
+
+def _runBranchWorker(args): #runs one slice of the frontier to completion (or timeout) inside a pool worker
+
+	costArray, states, bssfCost, time_allowance, start_time, maxStates, overflow, bounder, keepFrontier, profile = args
+
+	profiler = searchProfiler() if profile else None
+	search = branchSearch(costArray, None, bssfCost, time_allowance, start_time, sharedBound=_workerBound, maxStates=maxStates, overflow=overflow, bounder=bounder, profiler=profiler)
+
+	for state in states:
+		search.push(state)
+
+	search.run()
+	search.recordProfile()
+
+	frontier = search.frontierArrays() if keepFrontier else None #whatever is left when time ran out, for a checkpoint
+	report = profiler.report() if profiler is not None else None
+
+	return search.bssfPath, search.bssfCost, search.counters(), frontier, report
+
+def mergeFrontiers(frontiers): #concatenates frontierArrays() results, shifting each offset array past the paths before it
+
+	flats = [flat for flat, offsets, bounds in frontiers]
+	offsets = [np.zeros(1, dtype=int)]
+	shift = 0
+
+	for flat, frontierOffsets, bounds in frontiers:
+		offsets.append(frontierOffsets[1:] + shift)
+		shift += len(flat)
+
+	return (np.concatenate(flats) if flats else np.zeros(0, dtype=np.int32), np.concatenate(offsets),
+			np.concatenate([bounds for flat, frontierOffsets, bounds in frontiers]) if frontiers else np.zeros(0))
+
+class localSearch: #first-improvement 2-opt / Or-opt / swap search over a tour of city ids; every candidate move is scored in O(1)
+	#dist is a rows=from, cols=to matrix (as built by cityCostArray); a move only costs O(n) when it is actually applied
+	#the *Delta/apply* pairs are the move primitives; the try* methods drive them from neighbor lists
+
+	def __init__(self, dist, tour, neighborCount=NEIGHBOR_COUNT):
+
+		self.n = len(tour)
+		self.dist = dist
+		self.d = dist.tolist() #scalar lookups on nested lists are much cheaper than ndarray indexing
+		self.tour = list(tour)
+		self.pos = [0] * self.n #position of every city in tour
+		self.neighbors = np.argsort(dist, axis=1, kind='stable')[:, :min(neighborCount, self.n - 1)].tolist() if neighborCount else None #cheapest successors of every city, ascending
+		self.moves = 0
+		self.rebuild()
+
+	def rebuild(self): #O(n); refresh positions and the prefix sums that make segment reversal O(1) to score
+
+		for position, city in enumerate(self.tour):
+			self.pos[city] = position
+
+		doubled = np.array(self.tour + self.tour) #doubling the tour lets a wrapping segment be read as one contiguous range
+		forward = self.dist[doubled[:-1], doubled[1:]]
+		backward = self.dist[doubled[1:], doubled[:-1]] #the same edges traversed the other way, i.e. after a reversal
+
+		self.fwd = np.concatenate(([0.0], np.cumsum(np.where(np.isinf(forward), 0.0, forward)))).tolist()
+		self.bwd = np.concatenate(([0.0], np.cumsum(np.where(np.isinf(backward), 0.0, backward)))).tolist()
+		self.bwdInf = np.concatenate(([0], np.cumsum(np.isinf(backward)))).tolist() #a reversed segment is only usable if it has no missing edges
+
+	def cost(self): #O(n)
+
+		tour = np.array(self.tour)
+
+		return self.dist[tour, np.roll(tour, -1)].sum()
+
+	def twoOptDelta(self, i, length): #a->b ... c->e becomes a->c ... b->e, reversing positions i+1 .. i+length (2 <= length <= n-2); needs fresh prefix sums
+
+		n, d, tour = self.n, self.d, self.tour
+		a = tour[i]
+		b = tour[(i + 1) % n]
+		c = tour[(i + length) % n]
+		e = tour[(i + length + 1) % n]
+
+		if self.bwdInf[i + length] != self.bwdInf[i + 1]: #reversed segment would use a missing edge
+			return np.inf
+
+		return d[a][c] + d[b][e] - d[a][b] - d[c][e] + (self.bwd[i + length] - self.bwd[i + 1]) - (self.fwd[i + length] - self.fwd[i + 1])
+
+	def applyTwoOpt(self, i, length): #O(length)
+
+		n, tour = self.n, self.tour
+		positions = [(i + 1 + k) % n for k in range(length)]
+		segment = [tour[p] for p in positions]
+		segment.reverse()
+		for p, city in zip(positions, segment):
+			tour[p] = city
+
+	def orOptDelta(self, i, length, e): #p->a..last->q and c->e become p->q and c->a..last->e; e must be outside the segment and not q
+
+		n, d, tour = self.n, self.d, self.tour
+		p = tour[(i - 1) % n]
+		a = tour[i]
+		last = tour[(i + length - 1) % n]
+		q = tour[(i + length) % n]
+		c = tour[(self.pos[e] - 1) % n]
+
+		return d[p][q] + d[c][a] + d[last][e] - d[p][a] - d[last][q] - d[c][e]
+
+	def applyOrOpt(self, i, length, e): #O(n)
+
+		segment = [self.tour[(i + k) % self.n] for k in range(length)]
+		moved = set(segment)
+		rest = [city for city in self.tour if city not in moved]
+		at = rest.index(e)
+		self.tour = rest[:at] + segment + rest[at:]
+
+	def swapDelta(self, i, j): #exchange the cities at positions i and j (i != j)
+
+		n, d, tour = self.n, self.d, self.tour
+
+		if (i + 1) % n != j and (j + 1) % n == i: #only j directly before i; score it the other way round
+			i, j = j, i
+
+		p = tour[(i - 1) % n]
+		a = tour[i]
+		an = tour[(i + 1) % n]
+		c = tour[j]
+		cn = tour[(j + 1) % n]
+
+		if c == an: #p a c cn becomes p c a cn
+			return d[p][c] + d[c][a] + d[a][cn] - d[p][a] - d[a][c] - d[c][cn]
+
+		cp = tour[(j - 1) % n] #p a an ... cp c cn becomes p c an ... cp a cn
+		return d[p][c] + d[c][an] + d[cp][a] + d[a][cn] - d[p][a] - d[a][an] - d[cp][c] - d[c][cn]
+
+	def applySwap(self, i, j): #O(1)
+
+		self.tour[i], self.tour[j] = self.tour[j], self.tour[i]
+
+	def tryTwoOpt(self, a): #makes a->c the new edge out of a, for a neighbor c; returns the cities whose edges changed, or None
+
+		n, d, tour = self.n, self.d, self.tour
+		i = self.pos[a]
+		b = tour[(i + 1) % n]
+		dab = d[a][b]
+
+		for c in self.neighbors[a]:
+
+			if d[a][c] >= dab: #neighbors are sorted, so no later c can make a->c cheaper than a->b
+				break
+
+			length = (self.pos[c] - i) % n #segment is positions i+1 .. i+length
+
+			if length < 2 or length > n - 2:
+				continue
+
+			if self.twoOptDelta(i, length) < -MOVE_EPS: #an Inf on the added side makes delta Inf (or nan), which never passes
+				e = tour[(i + length + 1) % n]
+				self.applyTwoOpt(i, length)
+				return [a, b, c, e]
+
+		return None
+
+	def tryOrOpt(self, a): #move the 1-3 city segment starting at a so that it ends just before a neighbor e of its last city
+
+		n, d, tour = self.n, self.d, self.tour
+		i = self.pos[a]
+		p = tour[(i - 1) % n]
+
+		for length in (1, 2, 3):
+
+			if length > n - 3:
+				break
+
+			last = tour[(i + length - 1) % n]
+			q = tour[(i + length) % n]
+			removeGain = d[p][a] + d[last][q] - d[p][q] #p->a, last->q become p->q
+
+			if removeGain == -np.inf or removeGain != removeGain: #p->q is missing (or the tour already was broken here)
+				continue
+
+			for e in self.neighbors[last]:
+
+				if d[last][e] >= removeGain:
+					break
+
+				if (self.pos[e] - i) % n <= length: #e is inside the segment or is q (which would leave it in place)
+					continue
+
+				if self.orOptDelta(i, length, e) < -MOVE_EPS:
+					c = tour[(self.pos[e] - 1) % n]
+					self.applyOrOpt(i, length, e)
+					return [p, q, c, e, a, last]
+
+		return None
+
+	def trySwap(self, a): #exchange a with a city c so that a's predecessor p gets the cheaper edge p->c
+
+		n, d, tour = self.n, self.d, self.tour
+		i = self.pos[a]
+		p = tour[(i - 1) % n]
+		an = tour[(i + 1) % n]
+		dpa = d[p][a]
+
+		for c in self.neighbors[p]:
+
+			if d[p][c] >= dpa:
+				break
+
+			j = self.pos[c]
+
+			if self.swapDelta(i, j) < -MOVE_EPS:
+				cn = tour[(j + 1) % n]
+				cp = tour[(j - 1) % n]
+				self.applySwap(i, j)
+				return [p, a, an, c, cn, cp]
+
+		return None
+
+	def improve(self, time_allowance=60.0, start_time=None): #don't-look-bit driven sweep until no city has an improving move; returns moves applied
+
+		start_time = time.time() if start_time is None else start_time
+
+		if self.n < 5: #too small for any of the moves to be well defined
+			return self.moves
+
+		queue = collections.deque(self.tour) #cities whose don't-look bit is off
+		active = [True] * self.n
+
+		while queue and time.time() - start_time < time_allowance:
+
+			a = queue.popleft()
+			active[a] = False
+			touched = self.tryTwoOpt(a) or self.tryOrOpt(a) or self.trySwap(a)
+
+			if touched:
+				self.moves += 1
+				self.rebuild()
+
+				for city in touched: #endpoints of changed edges get looked at again
+					if not active[city]:
+						active[city] = True
+						queue.append(city)
+
+		return self.moves
+
+class annealer(localSearch): #one simulated-annealing chain; proposes random 2-opt / Or-opt / swap moves scored with localSearch's O(1) deltas
+	#moves are drawn around the neighbor lists (random city, random near neighbor) so most proposals are plausible ones
+
+	def __init__(self, dist, tour, seed=None, neighbors=None):
+
+		localSearch.__init__(self, dist, tour, neighborCount=0 if neighbors is not None else NEIGHBOR_COUNT)
+		if neighbors is not None: #shared, precomputed lists (pool workers build them once)
+			self.neighbors = neighbors
+		self.rng = np.random.RandomState(seed)
+		self.currCost = self.cost()
+		self.bestTour = list(self.tour)
+		self.bestCost = self.currCost
+		self.proposed = 0
+		self.accepted = 0
+		self.temperature = None
+		self.stale = False #prefix sums out of date; only 2-opt needs them, so they are rebuilt lazily
+
+	def propose(self, kind, city, length, pick, uniform): #scores one random move and applies it under the Metropolis rule
+
+		n, tour = self.n, self.tour
+		self.proposed += 1
+
+		if kind == 0: #2-opt making city->c an edge, for a near neighbor c
+			c = self.neighbors[city][pick % len(self.neighbors[city])]
+			i = self.pos[city]
+			length = (self.pos[c] - i) % n
+			if length < 2 or length > n - 2:
+				return
+			if self.stale:
+				self.rebuild()
+				self.stale = False
+			delta = self.twoOptDelta(i, length)
+		elif kind == 1: #Or-opt, the 1-3 city segment starting at city re-inserted before a near neighbor e of its last city
+			i = self.pos[city]
+			last = tour[(i + length - 1) % n]
+			e = self.neighbors[last][pick % len(self.neighbors[last])]
+			if (self.pos[e] - i) % n <= length or length > n - 3:
+				return
+			delta = self.orOptDelta(i, length, e)
+		else: #swap city with a near neighbor c of its predecessor
+			i = self.pos[city]
+			p = tour[(i - 1) % n]
+			c = self.neighbors[p][pick % len(self.neighbors[p])]
+			if c == city:
+				return
+			j = self.pos[c]
+			delta = self.swapDelta(i, j)
+
+		if not (delta < 0 or uniform < math.exp(-delta / self.temperature)): #nan and Inf deltas fail both tests
+			return
+
+		if kind == 0:
+			self.applyTwoOpt(i, length)
+		elif kind == 1:
+			self.applyOrOpt(i, length, e)
+		else:
+			self.applySwap(i, j)
+
+		if kind == 2: #a swap only moves two cities; the others shift positions
+			self.pos[tour[i]] = i
+			self.pos[tour[j]] = j
+		else:
+			for position, movedCity in enumerate(self.tour):
+				self.pos[movedCity] = position
+
+		self.stale = True
+		self.accepted += 1
+		self.currCost += delta
+
+		if self.currCost < self.bestCost - MOVE_EPS:
+			self.bestCost = self.currCost
+			self.bestTour = list(self.tour)
+
+	def anneal(self, time_allowance, startTemperature, endTemperature, start_time=None): #geometric cooling from start to end temperature over time_allowance
+
+		start_time = time.time() if start_time is None else start_time
+		n = self.n
+
+		if n < 5:
+			return
+
+		while True:
+			elapsed = time.time() - start_time
+
+			if elapsed >= time_allowance:
+				break
+
+			self.temperature = startTemperature * (endTemperature / startTemperature) ** (elapsed / time_allowance)
+
+			kinds = self.rng.randint(0, 3, SA_BLOCK) #random numbers are drawn a block at a time
+			cities = self.rng.randint(0, n, SA_BLOCK).tolist()
+			lengths = self.rng.randint(1, 4, SA_BLOCK).tolist()
+			picks = self.rng.randint(0, 1 << 30, SA_BLOCK).tolist()
+			uniforms = self.rng.random_sample(SA_BLOCK).tolist()
+			kinds = kinds.tolist()
+
+			for move in range(SA_BLOCK):
+				self.propose(kinds[move], cities[move], lengths[move], picks[move], uniforms[move])
+
+		self.currCost = self.cost() #drop any floating point drift from the running sum
+
+_workerDist = None #distance matrix and neighbor lists installed once per annealing pool worker by _initAnnealWorker
+_workerNeighbors = None
+
+def _initAnnealWorker(dist):
+
+	global _workerDist, _workerNeighbors
+	_workerDist = dist
+	_workerNeighbors = np.argsort(dist, axis=1, kind='stable')[:, :min(NEIGHBOR_COUNT, dist.shape[0] - 1)].tolist()
+
+def _runAnnealChain(args): #one epoch of one chain; returns the chain's best and current tours plus its statistics
+
+	tour, time_allowance, startTemperature, endTemperature, seed = args
+
+	chain = annealer(_workerDist, tour, seed, _workerNeighbors)
+	chain.anneal(time_allowance, startTemperature, endTemperature)
+
+	return chain.bestTour, chain.bestCost, chain.tour, chain.currCost, chain.proposed, chain.accepted, chain.temperature
+
+def heldKarpTour(dist, time_allowance=60.0, start_time=None): #O(n^2 2^n) time, O(n 2^n) space exact solver; dist is rows=from, cols=to
+	#returns (path, cost, statesFilled, largestLayer), or None if there is no tour or time runs out
+	#dp[mask, j] is the cheapest path that leaves city 0, visits exactly the cities in mask (city i+1 <=> bit i) and ends at city j+1
+	#int32 costs and int8 parents keep n=23 to ~460MB; masks are processed one popcount layer at a time so each layer is a handful of gathers
+
+	start_time = time.time() if start_time is None else start_time
+	n = dist.shape[0]
+	m = n - 1
+	subsets = 1 << m
+	full = subsets - 1
+
+	if n < 3: #nothing to order
+		path = list(range(n))
+		return path, dist[path, np.roll(path, -1)].sum(), 0, 0
+
+	finite = dist[np.isfinite(dist)]
+	integral = finite.size > 0 and np.all(finite == np.floor(finite)) and finite.max() * n < HELD_KARP_INT_INF
+	if integral: #every DP value fits in an int32 with room for the sentinel
+		dtype, inf = np.int32, HELD_KARP_INT_INF
+		edges = np.where(np.isfinite(dist), dist, inf).astype(np.int64)
+	else:
+		dtype, inf = np.float64, np.inf
+		edges = dist
+
+	dp = np.full((subsets, m), inf, dtype=dtype)
+	parent = np.full((subsets, m), -1, dtype=np.int8)
+	intoCity = edges[1:, 1:] #intoCity[i, j] = cost of city i+1 -> city j+1
+
+	for j in range(m): #single-city subsets leave straight from city 0
+		dp[1 << j, j] = edges[0, j + 1]
+
+	popcount = np.zeros(subsets, dtype=np.int8)
+	for bit in range(m):
+		popcount[1 << bit:1 << (bit + 1)] = popcount[:1 << bit] + 1
+	layers = np.argsort(popcount, kind='stable') #masks grouped by size
+	layerStarts = np.concatenate(([0], np.cumsum(np.bincount(popcount, minlength=m + 1))))
+	del popcount
+
+	statesFilled = m
+	largestLayer = m
+
+	for size in range(2, m + 1):
+		masks = layers[layerStarts[size]:layerStarts[size + 1]]
+		largestLayer = max(largestLayer, masks.size)
+
+		for j in range(m):
+
+			if time.time() - start_time > time_allowance:
+				return None
+
+			withJ = masks[(masks >> j) & 1 == 1]
+
+			for chunkStart in range(0, withJ.size, HELD_KARP_CHUNK): #bounds the size of the (chunk x m) temporaries
+				chunk = withJ[chunkStart:chunkStart + HELD_KARP_CHUNK]
+				candidates = dp[chunk ^ (1 << j)].astype(edges.dtype) + intoCity[:, j] #every way of stepping from i+1 into j+1
+				best = np.argmin(candidates, axis=1)
+				dp[chunk, j] = np.minimum(candidates[np.arange(chunk.size), best], inf)
+				parent[chunk, j] = best
+
+			statesFilled += withJ.size
+
+	closing = dp[full].astype(edges.dtype) + edges[1:, 0] #return to city 0
+	last = int(np.argmin(closing))
+
+	if closing[last] >= inf:
+		return None
+
+	path = []
+	mask = full
+	while mask: #walk the parent pointers back to city 0
+		path.append(last + 1)
+		previous = int(parent[mask, last])
+		mask ^= 1 << last
+		last = previous
+	path.append(0)
+	path.reverse()
+
+	return path, dist[path, np.roll(path, -1)].sum(), statesFilled, largestLayer
+
+class coreSolver: #TSPSolver without the GUI: the same algorithms and results dicts, over a rows=from cost matrix (np.inf = no edge)
+	#results carry 'tour', the city ids of the solution (or None), where TSPSolver's carry a TSPSolution in 'soln'
+	#build one from coordinates with coreSolver(pointCostArray(points)), or hand it any square cost matrix
+
+	def __init__( self, dist ):
+		dist = np.array(dist, dtype=float) #own copy; the diagonal is never a usable edge
+		if dist.ndim != 2 or dist.shape[0] != dist.shape[1]:
+			raise ValueError('Cost matrix must be square, got shape {}'.format(dist.shape))
+		np.fill_diagonal(dist, np.inf)
+		self.dist = dist
+		self.n = dist.shape[0]
+
+	def _tourResults( self, tour, start_time, count, maximum=None, total=None, pruned=None ): #the results dict every construction heuristic returns
+
+		results = {}
+		results['cost'] = self.dist[tour, np.roll(tour, -1)].sum() if tour is not None else np.inf
+		results['time'] = time.time() - start_time
+		results['count'] = count
+		results['tour'] = tour
+		results['max'] = maximum
+		results['total'] = total
+		results['pruned'] = pruned
+		return results
+
+	def defaultRandomTour( self, time_allowance=60.0, batch_size=None ):
+		#with batch_size, permutations are drawn and scored batch_size at a time; the best valid tour of the first batch that has one is kept
+		if batch_size is not None:
+			return self._randomTourBatched(time_allowance, batch_size)
+		dist = self.dist
+		count = 0
+		tour = None
+		start_time = time.time()
+		while tour is None and time.time()-start_time < time_allowance:
+			# create a random permutation
+			perm = np.random.permutation( self.n )
+			count += 1
+			# score it straight from the distance matrix
+			if dist[perm, np.roll(perm, -1)].sum() < np.inf:
+				# Found a valid route
+				tour = perm.tolist()
+		return self._tourResults(tour, start_time, count)
+
+	def _randomTourBatched( self, time_allowance, batch_size ): #count is the number of tours scored
+		start_time = time.time()
+		count = 0
+		tour = None
+
+		while tour is None and time.time() - start_time < time_allowance:
+			tours, costs = randomTourBatch(self.dist, batch_size)
+			count += batch_size
+			best = int(np.argmin(costs))
+			if costs[best] < np.inf:
+				tour = tours[best].tolist()
+
+		return self._tourResults(tour, start_time, count)
+
+	def _greedyMultiStart( self, time_allowance, multi_start=True, profiler=None ): #nearest neighbor from many start cities, built GREEDY_BATCH_ROWS at a time; count is the number of tours scored
+		start_time = time.time()
+		phase = profiler.phase if profiler is not None else untimedPhase
+		n = self.n
+		starts = np.arange(n) if multi_start is True else np.unique(np.linspace(0, n - 1, min(int(multi_start), n)).astype(int)) #evenly spaced, city 0 first
+		count = 0
+		bestTour = None
+		bestCost = np.inf
+
+		for firstStart in range(0, len(starts), GREEDY_BATCH_ROWS):
+			if time.time() - start_time > time_allowance:
+				break
+			with phase('batch'):
+				tours, costs = greedyTourBatch(self.dist, starts[firstStart:firstStart + GREEDY_BATCH_ROWS], start_time + time_allowance)
+			count += len(costs)
+			best = int(np.argmin(costs))
+			if costs[best] < bestCost:
+				bestTour, bestCost = tours[best].tolist(), costs[best]
+
+		return self._tourResults(bestTour, start_time, count)
+
+	def greedy( self,time_allowance=60.0, multi_start=False, profiler=None ): #overall, an O(n^2n!) time complexity, only O(n) space complexity (if a path is reset, so is the stored optPath)
+		#multi_start=True builds the nearest-neighbor tour from every start city in vectorized batches and keeps the best one, O(n^3);
+		#an int k builds it from k evenly spaced start cities instead, O(k n^2)
+		#profiler (a searchProfiler) times the run and counts the tours built; results['profile'] holds its report
+		if profiler is not None: #the profiled run wraps an ordinary one, so the unprofiled path stays as it was
+			with profiler.phase('total'), profiler.phase('greedy'):
+				results = self._greedyMultiStart(time_allowance, multi_start, profiler) if multi_start else self.greedy(time_allowance)
+			profiler.count('tours', results['count'])
+			results['profile'] = profiler.report()
+			return results
+
+		if multi_start:
+			return self._greedyMultiStart(time_allowance, multi_start)
+
+		start_time = time.time() #O(1) operations
+		dist = self.dist
+		n = self.n
+		startCity = 0 #first city is the first start city
+		tour = None
+		timeOut = False
+		tryCount = 0
+
+		while tour is None and not timeOut: #this is, again, technically O(n!), given no sparsity limit. in practice given the edge density, this is almost always one iteration
+
+			tryCount += 1 #if new starting point, add try
+			visited = np.zeros(n, dtype=bool) #cities already in optPath
+			visited[startCity] = True
+			optPath = [startCity] #init optimal path
+			currCity = startCity
+
+			for step in range(n - 1): #n^2 complexity inner loop; a path will be n long, evaluate n potential steps each time
+				if time.time() - start_time > time_allowance:
+
+					timeOut = True
+					break
+
+				edges = np.where(visited, np.inf, dist[currCity]) #O(n) vectorized scan of all possible next cities
+				destCity = int(np.argmin(edges))
+
+				if edges[destCity] == np.inf:
+
+					break #break out of inner loop if can't move forward
+
+				visited[destCity] = True #remove from available
+				optPath.append(destCity) #update optimal path
+				currCity = destCity
+
+			if len(optPath) == n and dist[currCity, startCity] != np.inf: #if final edge in cycle exists,
+
+				tour = optPath #exit outer loop
+
+			startCity = np.random.randint(n) #take a random city to restart greedy
+
+		return self._tourResults(tour, start_time, tryCount) #max/total/pruned are not needed, no states exist
+
+	def _greedySeed( self, time_allowance, profiler=None ): #the greedy tour searches start from; bounded in both starts and time so large scenarios keep their budget for the search
+		#GREEDY_SEED_STARTS starts, then single-start greedy (with its random restarts) if they find nothing, all within GREEDY_SEED_FRACTION of time_allowance
+		#on sparse or asymmetric matrices nearest neighbor may never close a tour; the tour is then None, and the caller searches without a seed
+		seedAllowance = time_allowance * GREEDY_SEED_FRACTION
+
+		results = self.greedy(seedAllowance, multi_start=GREEDY_SEED_STARTS, profiler=profiler)
+
+		if results['tour'] is None:
+			elapsed = results['time']
+			results = self.greedy(max(seedAllowance - elapsed, 0), profiler=profiler)
+			results['time'] += elapsed
+
+		return results
+
+	def _tourSeed( self, time_allowance, start_time, profiler=None ): #_greedySeed for solvers that need a starting tour (anneal, fancy)
+		#if greedy finds none, a seedless branch and bound runs until it reaches its first leaf; the tour is None only if that runs out of time too
+
+		results = self._greedySeed(time_allowance, profiler)
+
+		if results['tour'] is None:
+			search = branchSearch(self.dist.T.copy(), None, np.inf, time_allowance, start_time)
+			search.seed()
+			tour = next(search.improvements(), None)
+			if tour is not None:
+				results = self._tourResults(tour, start_time, results['count'] + 1)
+
+		return results
+
+	def heldKarp( self, time_allowance=60.0 ): #exact O(n^2 2^n) bitmask DP; predictable runtime, meant for scenarios up to ~20-23 cities
+		start_time = time.time()
+
+		solved = heldKarpTour(self.dist, time_allowance, start_time)
+
+		if solved is None: #timed out (or no tour exists); fall back to the greedy tour
+			results = self.greedy(max(time_allowance - (time.time() - start_time), 0))
+			results['time'] = time.time() - start_time
+			return results
+
+		path, cost, statesFilled, largestLayer = solved
+
+		#largest subset layer held at once, DP states filled; nothing is pruned, every subset is evaluated
+		return self._tourResults(path, start_time, 1, maximum=largestLayer, total=statesFilled, pruned=0)
+
+	def _prepareSearch( self, time_allowance, start_time, memory_budget, overflow, bound, resume=None, profiler=None ): #greedy seed plus a seeded branchSearch; shared by branchAndBound and branchAndBoundIter
+		#resume names a checkpoint whose frontier replaces the seeded first edges
+
+		greedyResults = self._greedySeed(time_allowance, profiler) #init greedy bssf (best of GREEDY_SEED_STARTS starts); much higher variance than random heuristic, but can be exceptionally faster
+		greedyPath = greedyResults['tour']
+		greedyCost = greedyResults['cost']
+
+		maxStates = stateBudget(memory_budget, self.n) if memory_budget is not None else None
+		bounder = makeBound(bound, self.dist)
+		search = branchSearch(self.dist.T.copy(), greedyPath, greedyCost, time_allowance, start_time, maxStates=maxStates, overflow=overflow, bounder=bounder, profiler=profiler) #init the zero-state cost matrix; space cost of O(n^2)
+
+		phase = profiler.phase if profiler is not None else untimedPhase
+
+		with phase('seed'):
+			if resume is not None:
+				search.loadCheckpoint(resume)
+			else:
+				search.seed()
+
+		return search
+
+	def _exactDispatch( self, exact_threshold, processes=1, memory_budget=None, checkpoint=None, resume=None ): #whether branchAndBound(Iter) hands this scenario to heldKarp
+		#options that only make sense for a search (a pool, a queue budget, a frontier to save or load) keep it a branch and bound
+
+		return self.n <= exact_threshold and processes == 1 and memory_budget is None and checkpoint is None and resume is None
+
+	def _exactSearch( self, time_allowance, start_time, callback=None, profiler=None ): #heldKarp with every results key, callback and profile a search would give
+
+		phase = profiler.phase if profiler is not None else untimedPhase
+
+		with phase('total'), phase('held_karp'):
+			results = self.heldKarp(time_allowance)
+
+		lowerBound = results['cost'] if results['pruned'] == 0 else -np.inf #pruned is 0 only when the DP finished; its greedy fallback proves nothing
+		progress = self._progress(results['tour'], results['cost'], start_time, results['total'], 0, lowerBound)
+		if callback is not None and results['tour'] is not None:
+			callback(progress)
+
+		results['time'] = time.time() - start_time
+		for key in ('evicted', 'bound_pruned', 'purged', 'reclaimed_bytes', 'purge_time'): #nothing is evicted, bounded or compacted
+			results[key] = 0
+		if profiler is not None:
+			results['profile'] = profiler.report()
+
+		return results, progress
+
+	def _progress( self, tour, cost, start_time, expanded, queue, lowerBound ): #one anytime update; gap is how far the bssf can still be from optimal
+
+		return {'tour': tour, 'cost': cost, 'time': time.time() - start_time, 'expanded': expanded, 'queue': queue,
+				'lower_bound': lowerBound, 'gap': cost - lowerBound}
+
+	def branchAndBoundIter( self, time_allowance=60.0, memory_budget=None, overflow='evict', exact_threshold=HELD_KARP_MAX_CITIES, bound='reduction', checkpoint=None, resume=None ):
+		#anytime form of branchAndBound: yields a _progress dict for the seed bssf and then for every improved bssf
+		#stop iterating to stop the search (the checkpoint, if any, is still written); options mean the same as in branchAndBound
+		start_time = time.time()
+
+		if self._exactDispatch(exact_threshold, memory_budget=memory_budget, checkpoint=checkpoint, resume=resume): #heldKarp only has one (optimal) answer to give
+			yield self._exactSearch(time_allowance, start_time)[1]
+			return
+
+		search = self._prepareSearch(time_allowance, start_time, memory_budget, overflow, bound, resume)
+
+		try:
+			yield self._progress(search.bssfPath, search.bssfCost, start_time, search.expandedStates, search.pathQueue.length, search.lowerBound())
+
+			for bssfPath in search.improvements():
+				yield self._progress(bssfPath, search.bssfCost, start_time, search.expandedStates, search.pathQueue.length, search.lowerBound())
+		finally:
+			if checkpoint is not None:
+				search.saveCheckpoint(checkpoint)
+
+	def branchAndBound( self, time_allowance=60.0, processes=1, memory_budget=None, overflow='evict', exact_threshold=HELD_KARP_MAX_CITIES, bound='reduction', callback=None, checkpoint=None, resume=None, profiler=None ): #TOTAL ALGORITHM TIME COMPLEXITY => O(n^4n!) [reduced from O(n^2 + n^3logn + n^4n!logn)]; SPACE COMPEXITY => O(n^3n!) at max queue size
+		#processes > 1 splits the seeded frontier across a process pool; workers prune against a shared bssf cost
+		#memory_budget (bytes) caps the queue at O(memory_budget) space; at the cap the search either evicts the worst-bound states or dives depth-first (overflow='dive')
+		#either way optimality is no longer guaranteed once anything has been evicted
+		#scenarios with at most exact_threshold cities are solved by heldKarp instead (pass 0 to always branch and bound), unless processes > 1,
+		#memory_budget, checkpoint or resume ask for a search; results carry the same keys either way, callback gets the one (optimal) tour
+		#bound='onetree' (or any strategy object with picks()/bound()) lets states tighten the reduction bound; results['bound_pruned'] counts the extra prunes
+		#callback(progress) is called with a _progress dict for every improved bssf; returning False stops the search early
+		#(in parallel mode improvements only reach the parent as workers finish, so the callback is not called)
+		#checkpoint names a file that receives the frontier, bssf and counters when the search stops; resume continues from such a file
+		#so a long search can be run as a series of time_allowance windows (same scenario, checkpoint=resume=file)
+		#profiler is a searchProfiler that gets phase times (reduce, copy, heap, bound, leaf, ...), state and heap sift counts and prune depths; results['profile'] holds its report
+		#(phase times from parallel workers are summed, so they add up to more than the wall time)
+		start_time = time.time()
+		results = {}
+
+		if self._exactDispatch(exact_threshold, processes, memory_budget, checkpoint, resume):
+			return self._exactSearch(time_allowance, start_time, callback, profiler)[0]
+
+		phase = profiler.phase if profiler is not None else untimedPhase
+
+		with phase('total'):
+			search = self._prepareSearch(time_allowance, start_time, memory_budget, overflow, bound, resume, profiler)
+
+			if processes > 1:
+				bssfPath, bssfCost, counters, frontier = self._parallelSearch(search, processes, keepFrontier=checkpoint is not None)
+				if checkpoint is not None:
+					with phase('checkpoint'):
+						search.bssfPath, search.bssfCost = bssfPath, bssfCost
+						search.saveCheckpoint(checkpoint, frontier, counters)
+			else:
+				for bssfPath in search.improvements():
+					if callback is not None:
+						progress = self._progress(bssfPath, search.bssfCost, start_time, search.expandedStates, search.pathQueue.length, search.lowerBound())
+						if callback(progress) is False:
+							break
+				search.recordProfile()
+				bssfPath, bssfCost, counters = search.bssfPath, search.bssfCost, search.counters()
+				if checkpoint is not None:
+					with phase('checkpoint'):
+						search.saveCheckpoint(checkpoint)
+
+		results['time'] = time.time() - start_time #return all solutions/reporting metrics
+		results['count'] = counters['count']
+		results['cost'] = bssfCost if bssfPath is not None else np.inf
+		results['tour'] = bssfPath
+		results['max'] = counters['max']
+		results['total'] = counters['total']
+		results['pruned'] = counters['pruned']
+		results['evicted'] = counters['evicted']
+		results['bound_pruned'] = counters['bound_pruned']
+		results['purged'] = counters['purged'] #stale states dropped by frontier compaction, and what that freed
+		results['reclaimed_bytes'] = counters['reclaimed_bytes']
+		results['purge_time'] = counters['purge_time']
+
+		if profiler is not None:
+			results['profile'] = profiler.report()
+
+		return results
+
+	def _parallelSearch( self, search, processes, keepFrontier=False ): #deals the frontier round-robin (best bound first) to a pool; counters are summed across workers
+		#with keepFrontier the workers' leftover states are merged into a 4th return value, for a checkpoint
+
+		while 0 < search.pathQueue.length < 4 * processes and not search.timeOut: #grow the frontier until every worker gets a few states
+			search.step()
+
+		frontier = sorted(search.pathQueue.tree, key=lambda state: state.bound)
+		slices = [frontier[worker::processes] for worker in range(processes)]
+		search.recordProfile() #the parent's share of the work ends here
+		search.pathQueue = stateHeap()
+
+		sharedBound = multiprocessing.Value('d', search.bssfCost)
+		maxStates = max(1, search.maxStates // processes) if search.maxStates is not None else None #the budget is split evenly between workers
+		jobs = [(search.costArray, states, search.bssfCost, search.time_allowance, search.start_time, maxStates, search.overflow, search.bounder, keepFrontier, search.profiler is not None) for states in slices if states]
+
+		bssfPath, bssfCost = search.bssfPath, search.bssfCost
+		counters = search.counters()
+		frontiers = []
+
+		with multiprocessing.Pool(processes, initializer=_initBranchWorker, initargs=(sharedBound,)) as pool:
+			for workerPath, workerCost, workerCounters, workerFrontier, workerProfile in pool.imap_unordered(_runBranchWorker, jobs):
+
+				if workerPath is not None and workerCost < bssfCost:
+					bssfPath, bssfCost = workerPath, workerCost
+
+				for key in counters:
+					counters[key] += workerCounters[key]
+
+				if workerFrontier is not None:
+					frontiers.append(workerFrontier)
+
+				if workerProfile is not None:
+					search.profiler.merge(workerProfile)
+
+		return bssfPath, bssfCost, counters, mergeFrontiers(frontiers)
+
+	def anneal( self, time_allowance=60.0, processes=None, chains=None, epochs=SA_EPOCHS ): #parallel simulated annealing for large scenarios
+		#chains (default: one per process) anneal independently from the greedy seed tour across a pool of processes (default: all cores)
+		#after each of the epochs, chains worse than the median restart from the best tour found so far
+		#results['chains'] holds per-chain totals: moves proposed / accepted, best cost reached, final temperature
+		start_time = time.time()
+		dist = self.dist
+		processes = processes or multiprocessing.cpu_count()
+		chains = chains or processes
+
+		seed = self._tourSeed(time_allowance, start_time)
+		if seed['tour'] is None:
+			return seed
+
+		bestTour = seed['tour']
+		bestCost = seed['cost']
+		tours = [bestTour] * chains
+		startTemperature = SA_START_TEMPERATURE * bestCost / self.n
+		stats = [{'proposed': 0, 'accepted': 0, 'best': bestCost, 'final_temperature': startTemperature} for chain in range(chains)]
+
+		pool = multiprocessing.Pool(processes, initializer=_initAnnealWorker, initargs=(dist,)) if processes > 1 else None
+		if pool is None:
+			_initAnnealWorker(dist)
+
+		try:
+			for epoch in range(epochs):
+				remaining = time_allowance - (time.time() - start_time)
+				if remaining <= 0:
+					break
+
+				epochTemperatures = (startTemperature * SA_COOLING ** (epoch / epochs), startTemperature * SA_COOLING ** ((epoch + 1) / epochs)) #this epoch's slice of the global schedule
+				jobs = [(tours[chain], remaining / (epochs - epoch), epochTemperatures[0], epochTemperatures[1], np.random.randint(1 << 30)) for chain in range(chains)]
+				outcomes = pool.map(_runAnnealChain, jobs) if pool is not None else list(map(_runAnnealChain, jobs))
+
+				for chain, (chainBest, chainBestCost, chainTour, chainCost, proposed, accepted, temperature) in enumerate(outcomes):
+					stats[chain]['proposed'] += proposed
+					stats[chain]['accepted'] += accepted
+					stats[chain]['best'] = min(stats[chain]['best'], chainBestCost)
+					stats[chain]['final_temperature'] = temperature
+					tours[chain] = chainTour
+					if chainBestCost < bestCost:
+						bestTour, bestCost = chainBest, chainBestCost
+
+				median = np.median([outcome[3] for outcome in outcomes])
+				for chain, outcome in enumerate(outcomes): #exchange: the weaker half picks up the best tour
+					if outcome[3] > median:
+						tours[chain] = bestTour
+		finally:
+			if pool is not None:
+				pool.close()
+				pool.join()
+
+		results = self._tourResults(list(bestTour), start_time, sum(chain['accepted'] for chain in stats), total=sum(chain['proposed'] for chain in stats))
+		results['chains'] = stats
+		return results
+
+	def fancy( self,time_allowance=60.0, profiler=None ):
+		# profiler (a searchProfiler) gets the greedy and local_search phases plus the move count
+		start_time = time.time()
+		phase = profiler.phase if profiler is not None else untimedPhase
+		with phase('total'):
+			# use greedy algorithm to get initial solution
+			bssf = self._tourSeed(time_allowance, start_time, profiler)
+			# if the greedy algorithm didn't find a solution (unlikely) return
+			if bssf['tour'] is None:
+				return bssf
+
+			# polish the greedy tour with 2-opt / Or-opt / swap moves, scored against the distance matrix
+			with phase('local_search'):
+				engine = localSearch(self.dist, bssf['tour'])
+				improvements = engine.improve(time_allowance, start_time)
+
+		cost = engine.cost()
+		if cost < bssf['cost']:
+			bssf['cost'] = cost
+			bssf['tour'] = list(engine.tour)
+		# count every applied improving move as a solution found
+		bssf['count'] += improvements
+		bssf['time'] = time.time() - start_time
+		if profiler is not None:
+			profiler.count('moves', improvements)
+			bssf['profile'] = profiler.report()
+		return bssf
+
+def _runBatchJob(args): #solves one solveBatch instance inside a pool worker; returns its stream index with the results
+
+	index, dist, algorithm, time_allowance, options = args
+
+	if algorithm in ('branchAndBound', 'anneal'): #pool workers can't start pools of their own
+		options = dict(options, processes=1)
+
+	return index, getattr(coreSolver(dist), algorithm)(time_allowance, **options)
+
+def _batchJobs(instances, algorithm, time_allowance): #normalizes solveBatch's stream into _runBatchJob arguments, validating each instance as it is read
+
+	for index, instance in enumerate(instances):
+		job = instance if isinstance(instance, dict) else {'dist': instance}
+		jobAlgorithm = job.get('algorithm', algorithm)
+
+		if jobAlgorithm not in BATCH_ALGORITHMS:
+			raise ValueError('Unsupported algorithm for instance {}: {}'.format(index, jobAlgorithm))
+
+		yield index, job['dist'], jobAlgorithm, job.get('time_allowance', time_allowance), job.get('options', {})
+
+def solveBatch(instances, algorithm='fancy', time_allowance=60.0, processes=None): #solves a stream of instances across a process pool; yields (index, results) as each one finishes
+	#instances is any iterable of cost matrices, or of dicts {'dist': matrix, 'algorithm': name, 'time_allowance': seconds, 'options': {keyword: value}}
+	#where missing keys fall back to the arguments here; index is the instance's position in the stream, since results arrive in completion order
+	#results are coreSolver's for the chosen algorithm (see BATCH_ALGORITHMS); branchAndBound and anneal run single-process inside the workers
+	#processes defaults to all cores; processes=1 solves in this process, in stream order
+
+	jobs = _batchJobs(instances, algorithm, time_allowance)
+
+	if processes == 1:
+		for job in jobs:
+			yield _runBatchJob(job)
+		return
+
+	with multiprocessing.Pool(processes) as pool: #leaving early (closing this generator) terminates the pool
+		for index, results in pool.imap_unordered(_runBatchJob, jobs):
+			yield index, results